@@ -1,99 +1,167 @@
+import math
+import uuid
+import zipfile
+from pathlib import Path
+
 import streamlit as st
-import random
-import pandas as pd
+
+# NumPy arrive avec le cœur de simulation ; pandas seulement au premier graphique ou tableau
+from cmr import Simulation, creer_generateur, simuler_estimations
+from cmr.archive import exporter_classe, exporter_essais, exporter_seance, importer_seance
+from cmr.capacite import GestionnaireCapacite
+from cmr.classe import Agregat, DepotClasse
+from cmr.dynamique import Dynamique
+from cmr.graphiques import courbe, densite, histogramme, nuage
+from cmr.historiques import OCCASIONS_MAX
+from cmr.plan import meilleure_precision, plan_optimal
+from cmr.profilage import Profileur
+from cmr.spatial import Zone
+from cmr.statistiques import percentile_resultat, resume_observation, statistiques_exactes
+
+# --- PROFILAGE (activé depuis le panneau d'instrumentation) ---
+if 'profil' not in st.session_state:
+    st.session_state.profil = Profileur(session=uuid.uuid4().hex[:8])
+profil = st.session_state.profil
+profil.configurer(st.session_state.get('instrumentation', False), st.session_state.get('instrumentation_allocations', False))
+profil.nouveau_passage()
 
 # Configuration de la page
 st.set_page_config(page_title="Simulateur CMR - Capture-Marquage-Recapture", layout="centered")
 
 # --- CSS POUR ANIMATIONS CLIGNOTANTES ---
-st.markdown("""
-<style>
-@keyframes blink {
-    0%, 100% { opacity: 1; }
-    50% { opacity: 0.3; }
-}
-
-.blink-box {
-    animation: blink 1.5s ease-in-out infinite;
-    padding: 20px;
-    border-radius: 10px;
-    border: 3px solid;
-    font-size: 1.3em;
-    font-weight: bold;
-    margin: 20px 0;
-    text-align: center;
-}
-
-.blink-success {
-    background-color: #d4edda;
-    border-color: #28a745;
-    color: #155724;
-}
-
-.blink-warning {
-    background-color: #fff3cd;
-    border-color: #ffc107;
-    color: #856404;
-}
-
-.blink-info {
-    background-color: #d1ecf1;
-    border-color: #17a2b8;
-    color: #0c5460;
-}
-
-.blink-error {
-    background-color: #f8d7da;
-    border-color: #dc3545;
-    color: #721c24;
-}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def feuille_de_style():
+    """Feuille de style lue une seule fois par processus, pas à chaque passage."""
+    return f"<style>\n{(Path(__file__).parent / 'ressources' / 'animations.css').read_text(encoding='utf-8')}</style>"
+
+with profil.section("css"):
+    st.markdown(feuille_de_style(), unsafe_allow_html=True)
 
 # --- INITIALISATION ROBUSTE ---
-if 'poissons' not in st.session_state:
-    st.session_state.poissons = []
+# État de l'interface enregistré avec les séances (la simulation est enregistrée à part)
+CLES_SEANCE = ("etape", "module")
+if 'reprise' in st.session_state:
+    # Séance reprise au passage précédent : son état est posé avant la création des widgets
+    etat_repris = st.session_state.pop('reprise')
+    # Une séance reprise ne fait plus partie d'une expérience de classe : elle n'y soumet plus rien
+    for cle in CLES_SEANCE + ("graine_saisie", "classe", "classe_envoi"):
+        st.session_state.pop(cle, None)
+    st.session_state.update(etat_repris)
 if 'etape' not in st.session_state:
     st.session_state.etape = "reglage"
-if 'M' not in st.session_state:
-    st.session_state.M = 0
-if 'n' not in st.session_state:
-    st.session_state.n = 0
-if 'm' not in st.session_state:
-    st.session_state.m = 0
-if 'df_lagon' not in st.session_state:
-    st.session_state.df_lagon = pd.DataFrame()
-if 'df_filet' not in st.session_state:
-    st.session_state.df_filet = pd.DataFrame()
+# Une Simulation par session, avec son propre générateur PCG64 : pas d'état partagé
+# entre élèves, et une graine connue permet de rejouer exactement la même séance
+graine_saisie = st.session_state.get('graine_saisie')
+if 'simulation' not in st.session_state:
+    st.session_state.simulation = Simulation(graine_saisie)
+elif graine_saisie is not None and graine_saisie != st.session_state.simulation.graine:
+    st.session_state.simulation.reensemencer(graine_saisie)
+sim = st.session_state.simulation
+sim.vues.nouveau_passage()
+
+
+@st.cache_resource
+def gestionnaire_capacite():
+    """Un seul gestionnaire pour tout le processus : il voit les séances de tous les élèves."""
+    return GestionnaireCapacite()
+
+
+# Les séances inactives (ou les plus anciennes au-delà du plafond mémoire) sont endormies ;
+# celle-ci, touchée à l'instant, est reconstruite à l'identique si elle dormait
+capacite = gestionnaire_capacite()
+capacite.toucher(profil.session, sim)
+capacite.equilibrer()
 
 # --- FONCTIONS ---
 def generer_population(N):
-    st.session_state.poissons = [{'id': i, 'marque': False} for i in range(N)]
-    st.session_state.df_lagon = pd.DataFrame({
-        'x': [random.random() for _ in range(N)],
-        'y': [random.random() for _ in range(N)]
-    })
+    sim.generer(N)
     st.session_state.etape = "marquage"
-    st.session_state.M = 0
-    st.session_state.m = 0
-    st.session_state.df_filet = pd.DataFrame()
-
-def marquer_poissons(quantite):
-    non_marques = [p for p in st.session_state.poissons if not p['marque']]
-    a_marquer = random.sample(non_marques, min(quantite, len(non_marques)))
-    for p in a_marquer:
-        p['marque'] = True
-    st.session_state.M += len(a_marquer)
-
-def recapturer(quantite):
-    indices = random.sample(range(len(st.session_state.poissons)), min(quantite, len(st.session_state.poissons)))
-    st.session_state.n = len(indices)
-    st.session_state.m = sum(1 for i in indices if st.session_state.poissons[i]['marque'])
-    st.session_state.df_filet = pd.DataFrame({
-        'x': [random.random() for _ in range(st.session_state.n)],
-        'y': [random.random() for _ in range(st.session_state.n)],
-        'Statut': ['Marqué' if st.session_state.poissons[i]['marque'] else 'Non marqué' for i in indices]
-    })
+
+def choisir_zone(cle, libelle):
+    # Sans zone, on pêche au hasard dans tout le lagon (mélange parfait)
+    if not st.checkbox(libelle, key=f"{cle}_zone"):
+        return None
+    x = st.slider("Position x du centre", 0.0, 1.0, 0.5, 0.05, key=f"{cle}_x")
+    y = st.slider("Position y du centre", 0.0, 1.0, 0.5, 0.05, key=f"{cle}_y")
+    rayon = st.slider("Rayon", 0.05, 0.5, 0.2, 0.05, key=f"{cle}_rayon")
+    return Zone(x, y, rayon)
+
+def laisser_melanger(pas, force, animation=None):
+    if animation is None:
+        sim.melanger(pas, force)
+    else:
+        # Les images sont produites une à une pendant le mélange, jamais toutes gardées en mémoire
+        for numero, image in sim.images_melange(pas, force):
+            animation.vega_lite_chart(image, nuage(15), height=300)
+
+def formater_estimation(valeur):
+    return "—" if math.isnan(valeur) else f"{valeur:,.0f}".replace(',', ' ')
+
+def conseiller_plan(cle, N_min, N_max, taux_budget):
+    """Encadré « quel plan choisir ? » : le couple (M, n) le moins coûteux pour la précision demandée."""
+    with st.expander("🧮 Quel plan choisir pour la précision voulue ?"):
+        col_p, col_z = st.columns(2)
+        with col_p:
+            precision = st.select_slider("Précision visée (coefficient de variation)", options=[1, 2, 5, 10, 15, 20, 30], value=10,
+                                         format_func=lambda v: f"± {v} %", key=f"{cle}_cv")
+        with col_z:
+            risque = st.select_slider("Risque maximal de m = 0", options=[0.1, 1, 5, 100], value=1,
+                                      format_func=lambda v: "sans contrainte" if v == 100 else f"{v} %", key=f"{cle}_p0")
+        budget = st.checkbox(f"Respecter le budget du boss ({taux_budget:.0%} de N pour M et pour n)", value=True, key=f"{cle}_budget")
+        plafond = max(1, int(N_min * taux_budget)) if budget else None
+        risque_max = None if risque == 100 else risque / 100
+        with profil.section("plan_optimal"):
+            plan = plan_optimal(N_min, N_max, precision / 100, risque_max, plafond, plafond)
+        if plan is None:
+            st.warning("Aucun plan n'atteint cette précision avec ce budget : visez moins précis, ou négociez avec le boss !")
+            if plafond is not None:
+                # Plutôt qu'une impasse : ce que le budget permet au mieux
+                with profil.section("plan_optimal"):
+                    meilleur = meilleure_precision(N_min, N_max, risque_max, plafond, plafond)
+                pire = f" · au pire pour N entre {N_min} et {N_max}" if N_max != N_min else ""
+                st.info(f"Au mieux avec ce budget : marquer **M = {meilleur.M:,}** puis recapturer **n = {meilleur.n:,}** poissons · "
+                        f"précision ± {meilleur.cv:.0%} · P(m = 0) = {meilleur.p_m_nul:.1%}{pire}".replace(',', ' '))
+            return
+        st.success(f"Marquer **M = {plan.M:,}** puis recapturer **n = {plan.n:,}** poissons : {plan.M + plan.n:,} poissons manipulés.".replace(',', ' '))
+        pire = f" · au pire pour N entre {N_min} et {N_max}" if N_max != N_min else ""
+        st.caption(f"Précision obtenue : ± {plan.cv:.1%} · P(m = 0) = {plan.p_m_nul:.2%}{pire}")
+        st.vega_lite_chart({'x': plan.frontiere_M, 'y': plan.frontiere_n}, courbe("M marqués", "n minimal"), height=200)
+        st.caption("Chaque point : le plus petit n qui suffit pour ce M. Le meilleur plan minimise M + n.")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def repeter_recapture(N, M, n, repetitions, graine):
+    return simuler_estimations(N, M, n, repetitions, creer_generateur(graine)[1])
+
+@st.cache_resource
+def depot_classe():
+    """Base des expériences de classe, commune à toutes les sessions du serveur."""
+    return DepotClasse()
+
+@st.cache_resource(max_entries=32)
+def agregat_classe(code):
+    """Agrégat partagé par les tableaux de bord d'une expérience : chaque rafraîchissement ne lit que les nouveaux résultats."""
+    return Agregat(depot_classe().experience(code))
+
+@st.fragment(run_every=3)
+def tableau_de_bord(code, cle):
+    # Le tableau de bord (et N) n'est montré qu'avec la clé enseignant
+    if depot_classe().experience_enseignant(code, cle) is None:
+        return
+    agregat = agregat_classe(code)
+    agregat.rattraper(depot_classe())
+    st.subheader(f"👩‍🏫 Tableau de bord de l'expérience {code}")
+    col_a, col_b, col_c = st.columns(3)
+    col_a.metric("Résultats reçus", agregat.soumissions)
+    col_b.metric("Moyenne des estimations", formater_estimation(agregat.moyenne if agregat.estimations else math.nan))
+    col_c.metric("Estimation commune (Σ M·n / Σ m)", formater_estimation(agregat.estimation_commune))
+    if agregat.sans_recapture:
+        st.caption(f"{agregat.sans_recapture} résultats avec m = 0 : pas d'estimation individuelle, mais ils comptent dans l'estimation commune.")
+    if agregat.estimations:
+        effectifs, bornes = agregat.histogramme()
+        st.vega_lite_chart({'debut': bornes[:-1], 'fin': bornes[1:], 'effectif': effectifs}, histogramme("Estimation de N", "Élèves"), height=220)
+        st.caption(f"Écart-type des estimations individuelles : {formater_estimation(agregat.ecart_type)}")
+    if st.checkbox("🔓 Révéler N à la classe", key="classe_reveler"):
+        st.warning(f"La population réelle compte **{agregat.experience.N:,}** poissons.".replace(',', ' '))
 
 # --- INTERFACE ---
 st.title("🐟 Simulateur Capture-Marquage-Recapture (CMR)")
@@ -107,7 +175,31 @@ Si les marqués se répartissent uniformément, alors **p = M/N = m/n**, d'où *
 
 st.divider()
 
-module = st.sidebar.radio("Choisir le mode", ["Module 1 (N connu)", "Module 2 (N inconnu)"])
+module = st.sidebar.radio("Choisir le mode", ["Module 1 (N connu)", "Module 2 (N inconnu)"], key="module")
+
+st.sidebar.number_input("🎲 Graine aléatoire (optionnelle)", min_value=0, max_value=2**32 - 1, value=None, step=1, key="graine_saisie",
+                        help="Saisir la graine d'un élève puis refaire les mêmes actions rejoue exactement sa simulation.")
+st.sidebar.caption(f"Graine de la session : `{sim.graine}`")
+
+# --- SAUVEGARDE ET REPRISE DE LA SÉANCE ---
+with st.sidebar.expander("💾 Sauvegarder ou reprendre une séance"):
+    if sim.N_secret:
+        st.caption("🔒 La population étudiée a un N caché : l'enregistrer révélerait N. Générez une population à N connu pour sauvegarder.")
+    else:
+        etat_seance = {cle: st.session_state[cle] for cle in CLES_SEANCE if cle in st.session_state}
+        # L'archive n'est construite qu'au clic, pas à chaque passage
+        st.download_button("📥 Télécharger la séance", data=lambda etat=etat_seance: exporter_seance(sim, etat_app=etat, compresser=True),
+                           file_name=f"seance_{sim.graine}.npz", mime="application/zip", key="seance_telecharger")
+    fichier_seance = st.file_uploader("Reprendre une séance enregistrée", type="npz", key="seance_fichier")
+    if fichier_seance is not None and st.button("♻️ Reprendre cette séance", key="btn_seance_reprendre"):
+        try:
+            sim_reprise, etat_repris = importer_seance(fichier_seance)
+        except (KeyError, ValueError, zipfile.BadZipFile):
+            st.error("Ce fichier n'est pas une séance enregistrée par le simulateur.")
+        else:
+            st.session_state.simulation = sim_reprise
+            st.session_state.reprise = etat_repris
+            st.rerun()
 
 # ---------------------------------------------------------
 # MODULE 1 : N CONNU
@@ -116,17 +208,19 @@ if module == "Module 1 (N connu)":
     st.header("Module 1 : Fluctuations et Probabilités")
     
     if st.session_state.etape == "reglage":
-        N_init = st.number_input("Population totale (N)", min_value=1000, max_value=50000, value=10000, step=1000)
+        N_init = st.number_input("Population totale (N)", min_value=1000, max_value=10_000_000, value=10000, step=1000)
         st.caption(f"Population choisie : **{N_init:,}** poissons".replace(',', ' '))
         if st.button("Lancer la simulation"):
             generer_population(N_init)
             st.rerun()
 
     if st.session_state.etape in ["marquage", "recapture"]:
-        N_reel = len(st.session_state.poissons)
+        N_reel = sim.N
+        if sim.occasions_epuisees:
+            st.warning(f"📓 Le carnet de terrain est plein : {OCCASIONS_MAX} occasions de capture au plus par population. Générez une nouvelle population pour continuer.")
         
         # Limite progressive : 10% au début, 20% si l'élève a déjà fait une tentative
-        if st.session_state.M == 0:
+        if sim.M == 0:
             # Premier essai : limite stricte à 10%
             max_marquage = int(N_reel * 0.10)
             message_limite = "première tentative"
@@ -135,15 +229,18 @@ if module == "Module 1 (N connu)":
             max_marquage = int(N_reel * 0.20)
             message_limite = "deuxième tentative (le boss est plus cool maintenant)"
         
+        conseiller_plan("plan_m1", N_reel, N_reel, 0.10 if sim.M == 0 else 0.20)
+
         # --- ÉTAPE 1 : MARQUAGE ---
         st.subheader("**Étape 1 : Capture et Marquage**")
         col1, col2 = st.columns([1, 1.5])
         with col1:
             nb_a_marquer = st.number_input("Nombre à marquer (M)", value=min(100, max_marquage), key="m1_M", step=10)
+            zone_marquage = choisir_zone("m1_M", "📍 Marquer dans une seule zone du lagon")
             
             # Vérification de la contrainte budgétaire
             if nb_a_marquer > max_marquage:
-                if st.session_state.M == 0:
+                if sim.M == 0:
                     # Message strict pour le 1er essai
                     st.error(f"""
 ### 🤵 MESSAGE DU BOSS :
@@ -168,35 +265,74 @@ Cette fois, je t'autorise **jusqu'à {max_marquage} poissons (20% de la populati
 Mais pas plus hein ! Le budget a des limites quand même..."
 """)
             else:
-                if st.button("🎣 Lancer le marquage", key="btn_m1_M"):
-                    marquer_poissons(nb_a_marquer)
+                if st.button("🎣 Lancer le marquage", key="btn_m1_M", disabled=sim.occasions_epuisees):
+                    sim.marquer(nb_a_marquer, zone_marquage)
         with col2:
-            if N_reel > 0 and st.session_state.M > 0:
-                p_theorique = st.session_state.M / N_reel
+            if N_reel > 0 and sim.M > 0:
+                p_theorique = sim.M / N_reel
                 st.info(f"""
-**Nombre marqué = M = {st.session_state.M}**
+**Nombre marqué = M = {sim.M}**
 
 Soit la probabilité qu'un poisson soit marqué :
 **p = M / N = {p_theorique:.4f}**
 
-avec marqués M = {st.session_state.M} et population totale N = {N_reel:,}
+avec marqués M = {sim.M} et population totale N = {N_reel:,}
 
 _Mais pour N, seul nous le savons_ 🤫
 """.replace(',', ' '))
 
         # Visualisation du lagon (avec GROS POINTS)
-        if not st.session_state.df_lagon.empty:
-            st.session_state.df_lagon['Statut'] = ['Marqué' if p['marque'] else 'Non marqué' for p in st.session_state.poissons]
+        if N_reel > 0:
+            with profil.section("vue_lagon"):
+                lagon = sim.vue_lagon()
             st.write("### 🌊 Vue générale du lagon")
-            st.scatter_chart(st.session_state.df_lagon, x='x', y='y', color='Statut', height=300, size=15)
+            with profil.section("graphique_lagon"):
+                st.vega_lite_chart(lagon, nuage(15), height=300)
+            if len(lagon) < N_reel:
+                st.caption(f"{len(lagon):,} poissons tirés au hasard sont dessinés sur {N_reel:,}.".replace(',', ' '))
+
+        # --- ENTRE LES DEUX CAPTURES : LE TEMPS PASSE ---
+        if sim.M > 0:
+            with st.expander("⏳ Entre les deux captures, le temps passe..."):
+                st.caption("Par défaut la population est fermée, comme le suppose la méthode CMR. Modifiez les taux pour voir ce qui se passe quand les hypothèses ne sont plus respectées.")
+                col_t1, col_t2 = st.columns(2)
+                with col_t1:
+                    survie = st.slider("Survie (%)", min_value=50, max_value=100, value=100, key="dyn_survie")
+                    emigration = st.slider("Émigration (%)", min_value=0, max_value=30, value=0, key="dyn_emigration")
+                with col_t2:
+                    recrutement = st.slider("Naissances et immigration (%)", min_value=0, max_value=50, value=0, key="dyn_recrutement")
+                    perte_marque = st.slider("Perte de marques (%)", min_value=0, max_value=50, value=0, key="dyn_perte")
+                if st.button("⏳ Avancer d'un pas de temps", key="btn_m1_temps"):
+                    sim.faire_passer_le_temps(Dynamique(survie=survie / 100, emigration=emigration / 100,
+                                                    recrutement=recrutement / 100, perte_marque=perte_marque / 100))
+                    st.rerun()
+
+                st.caption("Les poissons marqués ont-ils eu le temps de se disperser dans tout le lagon ? Faites-les nager avant de recapturer.")
+                col_t3, col_t4 = st.columns(2)
+                with col_t3:
+                    agitation = st.slider("Agitation (% du lagon par pas)", min_value=0.5, max_value=10.0, value=2.0, step=0.5, key="mel_force")
+                with col_t4:
+                    duree_melange = st.slider("Durée (nombre de pas)", min_value=10, max_value=100, value=50, step=10, key="mel_pas")
+                animer = st.checkbox("🎬 Animer le mélange", key="mel_animer")
+                animation = st.empty() if animer else None
+                if st.button("🌊 Laisser les poissons nager", key="btn_m1_melange"):
+                    laisser_melanger(duree_melange, agitation / 100, animation)
+                    st.rerun()
+                bilan = sim.bilan_temps
+                if bilan is not None:
+                    st.info(f"""
+**Bilan du dernier pas de temps** : {bilan.morts:,} morts · {bilan.emigres:,} émigrés · {bilan.naissances:,} naissances · {bilan.marques_perdues:,} marques perdues
+
+La population compte maintenant **{N_reel:,}** poissons. Seuls {sim.population.M:,} portent encore une marque (vous en avez posé {sim.M:,}) !
+""".replace(',', ' '))
 
         # --- ÉTAPE 2 : RECAPTURE ---
-        if st.session_state.M > 0:
+        if sim.M > 0:
             st.divider()
             st.subheader("**Étape 2 : Recapture et Estimation**")
             
             # Limite progressive : 10% au début, 20% si l'élève a déjà fait une tentative
-            if st.session_state.n == 0:
+            if sim.n == 0:
                 # Premier essai de recapture : limite stricte à 10%
                 max_recapture = int(N_reel * 0.10)
             else:
@@ -204,10 +340,11 @@ _Mais pour N, seul nous le savons_ 🤫
                 max_recapture = int(N_reel * 0.20)
             
             nb_recap = st.number_input("Taille de la recapture (n)", value=min(100, max_recapture), key="m1_n", step=10)
+            zone_filet = choisir_zone("m1_n", "📍 Poser le filet dans une seule zone du lagon")
             
             # Vérification de la contrainte budgétaire
             if nb_recap > max_recapture:
-                if st.session_state.n == 0:
+                if sim.n == 0:
                     # Message strict pour le 1er essai
                     st.error(f"""
 ### 🤵 MESSAGE DU BOSS (encore lui !) :
@@ -232,37 +369,44 @@ Allez, cette fois je t'autorise **jusqu'à {max_recapture} poissons (20% de la p
 Mais c'est vraiment le max du max, compris ?!"
 """)
             else:
-                if st.button("🕸️ Lancer la recapture", key="btn_m1_n"):
-                    recapturer(nb_recap)
+                if st.button("🕸️ Lancer la recapture", key="btn_m1_n", disabled=sim.occasions_epuisees):
+                    sim.recapturer(nb_recap, zone_filet)
                     st.session_state.etape = "recapture"
                     st.rerun()
 
             if st.session_state.etape == "recapture":
-                if not st.session_state.df_filet.empty:
+                if sim.filet is not None:
                     st.write("### 🕸️ Contenu de votre filet (échantillon n)")
-                    st.scatter_chart(st.session_state.df_filet, x='x', y='y', color='Statut', height=200, size=25)
+                    if sim.n < nb_recap and zone_filet is not None:
+                        st.caption(f"La zone ne contenait que {sim.n} poissons : le filet n'a pas pu en prendre plus.")
+                    with profil.section("vue_filet"):
+                        filet = sim.vue_filet()
+                    with profil.section("graphique_filet"):
+                        st.vega_lite_chart(filet, nuage(25), height=200)
+                    if sim.n > len(filet):
+                        st.caption(f"Affichage de {len(filet):,} poissons pris au hasard dans le filet.".replace(',', ' '))
                     
                     # Affichage des résultats
                     col_a, col_b = st.columns([1, 1.5])
                     
                     with col_a:
-                        st.metric("Nombre de recapturés (n)", st.session_state.n)
-                        st.metric("Recapturés marqués (m)", st.session_state.m)
+                        st.metric("Nombre de recapturés (n)", sim.n)
+                        st.metric("Recapturés marqués (m)", sim.m)
                     
                     with col_b:
-                        if st.session_state.n > 0:
-                            p_prime = st.session_state.m / st.session_state.n if st.session_state.m > 0 else 0
+                        if sim.n > 0:
+                            p_prime = sim.m / sim.n if sim.m > 0 else 0
                             st.info(f"""
 **Et donc la probabilité de marquage ici est :**
 
 **p' = m / n = {p_prime:.4f}**
 
-avec m = {st.session_state.m}, n = {st.session_state.n}
+avec m = {sim.m}, n = {sim.n}
 """)
                     
                     # ESTIMATION DE N
-                    if st.session_state.m > 0:
-                        N_est = (st.session_state.M * st.session_state.n) / st.session_state.m
+                    if sim.m > 0:
+                        N_est = (sim.M * sim.n) / sim.m
                         st.success(f"""
 ### 🎯 Estimation : N ≈ **{int(N_est):,}**
 
@@ -361,9 +505,72 @@ Cela peut arriver si :
 </div>
 """, unsafe_allow_html=True)
 
+                    # --- CE QUE DIT LE CALCUL EXACT (loi hypergéométrique, sans simulation) ---
+                    # Valable seulement si les M marques posées sont toujours dans la population (et n ≤ N)
+                    if sim.population.M != sim.M or sim.n > N_reel:
+                        st.caption(f"📐 Le calcul exact et la répétition de la recapture supposent une population fermée : les {sim.M:,} "
+                                   f"marques posées devraient toujours être là, il en reste {sim.population.M:,}. Ils ne s'appliquent plus.".replace(',', ' '))
+                    else:
+                        with profil.section("statistiques_exactes"):
+                            stats = statistiques_exactes(N_reel, sim.M, sim.n)
+                        if sim.m > 0:
+                            percentile = percentile_resultat(N_reel, sim.M, sim.n, sim.m)
+                            N_chapman, ic_bas, ic_haut = resume_observation(sim.M, sim.n, sim.m)
+                            st.info(f"""
+**📐 Ce que dit le calcul exact**
+
+Votre estimation se situe au **{percentile:.0f}e percentile** de toutes les estimations possibles avec M = {sim.M} et n = {sim.n}.
+
+Estimateur de Chapman (corrigé du biais) : **N ≈ {N_chapman:,.0f}**
+
+Intervalle de confiance à 95 % : [{ic_bas:,.0f} ; {ic_haut:,.0f}]
+
+Probabilité d'obtenir m = 0 avec ces réglages : {stats.p_m_nul:.1%}
+""".replace(',', ' '))
+                        else:
+                            st.info(f"📐 **Calcul exact** : avec M = {sim.M} et n = {sim.n}, on ne recapture aucun marqué dans **{stats.p_m_nul:.1%}** des cas.")
+
+                        # --- RÉPÉTER LA RECAPTURE DES MILLIERS DE FOIS ---
+                        with st.expander("🔁 Et si on recommençait la recapture 10 000 fois ?"):
+                            col_r, col_g = st.columns([1.5, 1])
+                            with col_r:
+                                repetitions = st.select_slider("Nombre de répétitions", options=[1_000, 10_000, 100_000], value=10_000, key="mc_rep")
+                            with col_g:
+                                graine_mc = st.number_input("Graine", min_value=0, value=sim.graine, step=1, key="mc_graine")
+                            with profil.section("monte_carlo"):
+                                mc = repeter_recapture(N_reel, sim.M, sim.n, repetitions, graine_mc)
+                            effectifs, bornes = mc.histogramme()
+                            if len(effectifs) > 0:
+                                st.vega_lite_chart({'debut': bornes[:-1], 'fin': bornes[1:], 'effectif': effectifs},
+                                                   histogramme("N estimé", "Nombre de recaptures"), height=250)
+                            col_x, col_y, col_z = st.columns(3)
+                            col_x.metric("Moyenne de N estimé", f"{mc.moyenne:,.0f}".replace(',', ' '))
+                            col_y.metric("Biais", f"{mc.biais:+,.0f}".replace(',', ' '))
+                            col_z.metric("Écart-type", f"{mc.ecart_type:,.0f}".replace(',', ' '))
+                            st.caption(f"Variance : {mc.variance:,.0f} — recaptures avec m = 0 (N incalculable) : {mc.p_m_nul:.1%}".replace(',', ' '))
+                            st.caption(f"Valeurs exactes (sans simulation) : moyenne {stats.esperance_lp:,.0f} · écart-type {stats.variance_lp ** 0.5:,.0f} · m = 0 dans {stats.p_m_nul:.1%} des cas".replace(',', ' '))
+                            st.download_button("📥 Télécharger les essais", data=lambda resultat=mc: exporter_essais([resultat], compresser=True),
+                                               file_name=f"essais_N{N_reel}_M{sim.M}_n{sim.n}.npz", mime="application/zip", key="mc_telecharger")
+
+        # --- ÉTAPE 3 (BONUS) : CAPTURES SUCCESSIVES ---
+        if st.session_state.etape == "recapture":
+            st.divider()
+            st.subheader("**Étape 3 (bonus) : Captures successives, méthode de Schnabel**")
+            st.caption("À chaque occasion, on capture n poissons au hasard, on compte ceux qui sont déjà marqués, on marque les autres et on relâche tout le monde.")
+            if st.button("🎣 Nouvelle occasion de capture", key="btn_m1_occasion", disabled=sim.occasions_epuisees):
+                sim.capture_successive(min(nb_recap, max_recapture))
+                st.rerun()
+            st.dataframe(sim.vue_occasions(), hide_index=True)
+            historiques = sim.population.historiques
+            col_s, col_se = st.columns(2)
+            col_s.metric("Estimation de Schnabel", formater_estimation(historiques.schnabel()))
+            col_se.metric("Estimation de Schumacher-Eschmeyer", formater_estimation(historiques.schumacher_eschmeyer()))
+
     if st.sidebar.button("🔄 Réinitialiser le module"):
-        for key in list(st.session_state.keys()): 
-            del st.session_state[key]
+        # Tout repart de zéro, sauf le module choisi
+        for key in list(st.session_state.keys()):
+            if key != "module":
+                del st.session_state[key]
         st.rerun()
 
 # ---------------------------------------------------------
@@ -371,22 +578,62 @@ Cela peut arriver si :
 # ---------------------------------------------------------
 if module == "Module 2 (N inconnu)":
     st.header("Module 2 : Mode Scientifique (N caché)")
+
+    # --- EXPÉRIENCE DE CLASSE : ESPACE ENSEIGNANT ---
+    with st.sidebar.expander("👩‍🏫 Espace enseignant"):
+        if st.button("Créer une expérience de classe", key="btn_classe_creer"):
+            st.session_state.classe_suivie, st.session_state.classe_cle = depot_classe().creer_experience(sim.rng)
+        code_suivi = st.text_input("Code de l'expérience à suivre", key="classe_suivie")
+        cle_suivie = st.text_input("Clé enseignant", type="password", key="classe_cle",
+                                   help="Donnée à la création de l'expérience : elle seule ouvre le tableau de bord. Ne la communiquez pas aux élèves.")
+    if code_suivi and cle_suivie:
+        experience_suivie = depot_classe().experience_enseignant(code_suivi, cle_suivie)
+        if experience_suivie is None:
+            st.sidebar.error("Code d'expérience ou clé enseignant incorrect.")
+        else:
+            st.sidebar.caption(f"Code à donner aux élèves : **{experience_suivie.code}** — clé enseignant, à garder pour vous : `{cle_suivie}`")
+            st.sidebar.download_button("📥 Télécharger les résultats de la classe",
+                                       data=lambda code=experience_suivie.code, cle=cle_suivie: exporter_classe(depot_classe(), code, cle, compresser=True),
+                                       file_name=f"classe_{experience_suivie.code}.npz", mime="application/zip", key="classe_telecharger")
+            tableau_de_bord(experience_suivie.code, cle_suivie)
+            st.divider()
     
     if st.session_state.etape == "reglage":
         st.write("Le système va générer une population de poissons entre **500 et 3000**. À vous de trouver N !")
         if st.button("🎲 Générer la population mystère"):
-            generer_population(random.randint(500, 3000))
+            sim.generer_mystere(500, 3000)
+            st.session_state.etape = "marquage"
             st.rerun()
+        with st.expander("👥 Rejoindre l'expérience de la classe"):
+            code_eleve = st.text_input("Code donné par l'enseignant", key="classe_code")
+            if st.button("Rejoindre", key="btn_classe_rejoindre"):
+                experience = depot_classe().experience(code_eleve)
+                if experience is None:
+                    st.error("Aucune expérience ne porte ce code.")
+                else:
+                    # Toute la classe pêche dans le même lagon : même N, même graine
+                    sim.generer(experience.N, graine=experience.graine, secret=True)
+                    st.session_state.classe = experience.code
+                    st.session_state.etape = "marquage"
+                    st.rerun()
+
+    if 'classe' in st.session_state:
+        st.caption(f"👥 Expérience de classe **{st.session_state.classe}** : toute la classe étudie le même lagon.")
 
     if st.session_state.etape in ["marquage", "recapture"]:
-        N_reel = len(st.session_state.poissons)
+        N_reel = sim.N
+        if sim.occasions_epuisees:
+            st.warning(f"📓 Le carnet de terrain est plein : {OCCASIONS_MAX} occasions de capture au plus par population. Générez une nouvelle population pour continuer.")
         
         # Limite progressive : 10% au début, 20% si l'élève a déjà marqué
-        if st.session_state.M == 0:
+        if sim.M == 0:
             max_marquage = int(N_reel * 0.10)
         else:
             max_marquage = int(N_reel * 0.20)
         
+        # Sans connaître N, on prévoit pour tout l'intervalle annoncé (budget calculé sur le plus petit N)
+        conseiller_plan("plan_m2", 500, 3000, 0.10 if sim.M == 0 else 0.20)
+
         # --- ÉTAPE 1 : MARQUAGE (N caché) ---
         st.subheader("**Étape 1 : Capture et Marquage**")
         col1, col2 = st.columns([1, 1.5])
@@ -395,7 +642,7 @@ if module == "Module 2 (N inconnu)":
             
             # Vérification de la contrainte budgétaire (sans révéler N)
             if nb_m2 > max_marquage:
-                if st.session_state.M == 0:
+                if sim.M == 0:
                     st.error(f"""
 ### 🤵 MESSAGE DU BOSS :
 
@@ -417,19 +664,19 @@ Je te laisse marquer **jusqu'à {max_marquage} poissons cette fois**.
 Mais après, faudra faire avec hein !"
 """)
             else:
-                if st.button("🎣 Marquer et relâcher", key="btn_m2_M"):
-                    marquer_poissons(nb_m2)
+                if st.button("🎣 Marquer et relâcher", key="btn_m2_M", disabled=sim.occasions_epuisees):
+                    sim.marquer(nb_m2)
         with col2:
-            st.metric("Poissons marqués (M)", st.session_state.M)
+            st.metric("Poissons marqués (M)", sim.M)
             st.caption("⚠️ Vous ne connaissez pas N, donc **p = M/N est inconnu**.")
 
         # --- ÉTAPE 2 : RECAPTURE ---
-        if st.session_state.M > 0:
+        if sim.M > 0:
             st.divider()
             st.subheader("**Étape 2 : Recapture et Estimation**")
             
             # Limite progressive : 10% au début, 20% si l'élève a déjà fait une recapture
-            if st.session_state.n == 0:
+            if sim.n == 0:
                 max_recapture = int(N_reel * 0.10)
             else:
                 max_recapture = int(N_reel * 0.20)
@@ -438,7 +685,7 @@ Mais après, faudra faire avec hein !"
             
             # Vérification de la contrainte budgétaire
             if n_m2 > max_recapture:
-                if st.session_state.n == 0:
+                if sim.n == 0:
                     st.error(f"""
 ### 🤵 MESSAGE DU BOSS :
 
@@ -461,36 +708,50 @@ Allez, tiens : **{max_recapture} poissons maxi**.
 Mais c'est VRAIMENT le dernier effort budget que je peux faire !"
 """)
             else:
-                if st.button("🕸️ Lancer le filet", key="btn_m2_n"):
-                    recapturer(n_m2)
+                if st.button("🕸️ Lancer le filet", key="btn_m2_n", disabled=sim.occasions_epuisees):
+                    sim.recapturer(n_m2)
                     st.session_state.etape = "recapture"
                     st.rerun()
 
             if st.session_state.etape == "recapture":
-                if not st.session_state.df_filet.empty:
+                if sim.filet is not None:
                     st.write("### 🕸️ Contenu de votre filet")
-                    st.scatter_chart(st.session_state.df_filet, x='x', y='y', color='Statut', height=200, size=25)
+                    with profil.section("vue_filet"):
+                        filet = sim.vue_filet()
+                    with profil.section("graphique_filet"):
+                        st.vega_lite_chart(filet, nuage(25), height=200)
+                    if sim.n > len(filet):
+                        st.caption(f"Affichage de {len(filet):,} poissons pris au hasard dans le filet.".replace(',', ' '))
                     
                     col_a, col_b = st.columns([1, 1.5])
                     
                     with col_a:
-                        st.metric("Nombre de recapturés (n)", st.session_state.n)
-                        st.metric("Recapturés marqués (m)", st.session_state.m)
+                        st.metric("Nombre de recapturés (n)", sim.n)
+                        st.metric("Recapturés marqués (m)", sim.m)
                     
                     with col_b:
-                        if st.session_state.n > 0:
-                            p_prime = st.session_state.m / st.session_state.n if st.session_state.m > 0 else 0
+                        if sim.n > 0:
+                            p_prime = sim.m / sim.n if sim.m > 0 else 0
                             st.info(f"""
 **Probabilité de marquage observée :**
 
 **p' = m / n = {p_prime:.4f}**
 
-avec m = {st.session_state.m}, n = {st.session_state.n}
+avec m = {sim.m}, n = {sim.n}
 """)
                     
+                    # ENVOI À LA CLASSE (une fois par filet, m = 0 compris)
+                    if 'classe' in st.session_state:
+                        if st.session_state.get('classe_envoi') == sim.version:
+                            st.caption("✅ Résultat envoyé à la classe.")
+                        elif st.button("📤 Envoyer mon résultat à la classe", key="btn_classe_envoyer"):
+                            depot_classe().soumettre(st.session_state.classe, profil.session, sim.M, sim.n, sim.m)
+                            st.session_state.classe_envoi = sim.version
+                            st.rerun()
+                    
                     # ESTIMATION DE N
-                    if st.session_state.m > 0:
-                        N_est = (st.session_state.M * st.session_state.n) / st.session_state.m
+                    if sim.m > 0:
+                        N_est = (sim.M * sim.n) / sim.m
                         st.success(f"""
 ### 🎯 Votre estimation : N ≈ **{int(N_est):,}**
 
@@ -498,8 +759,10 @@ avec m = {st.session_state.m}, n = {st.session_state.n}
 """.replace(',', ' '))
                         
                         # RÉVÉLATION DE LA VRAIE VALEUR
-                        if st.checkbox("🔓 Révéler la population réelle (N)"):
-                            N_vrai = len(st.session_state.poissons)
+                        if 'classe' in st.session_state:
+                            st.caption("👥 Expérience de classe : c'est l'enseignant qui révélera N.")
+                        elif st.checkbox("🔓 Révéler la population réelle (N)"):
+                            N_vrai = sim.N
                             ecart = abs(int(N_est) - N_vrai)
                             pourcentage_ecart = (ecart / N_vrai) * 100
                             
@@ -537,9 +800,37 @@ Cela peut arriver si :
 </div>
 """, unsafe_allow_html=True)
 
+                    # LOI A POSTERIORI DE N (toutes les recaptures, y compris celles où m = 0)
+                    with st.expander("📈 Ce que vos captures disent de N (approche bayésienne)"):
+                        col_min, col_max = st.columns(2)
+                        with col_min:
+                            N_min_ap = st.number_input("N au moins", min_value=1, max_value=10_000_000, value=500, step=100, key="m2_ap_min")
+                        with col_max:
+                            N_max_ap = st.number_input("N au plus", min_value=1, max_value=10_000_000, value=3000, step=100, key="m2_ap_max")
+                        if N_max_ap < N_min_ap:
+                            st.error("La borne haute doit dépasser la borne basse.")
+                        else:
+                            with profil.section("a_posteriori"):
+                                loi = sim.loi_a_posteriori(int(N_min_ap), int(N_max_ap))
+                            if not loi.compatible:
+                                st.error(f"Vous avez déjà vu {loi.borne:,} poissons différents : N ne peut pas être inférieur !".replace(',', ' '))
+                            else:
+                                bas, haut = loi.intervalle(0.95)
+                                st.info(f"""
+**N le plus probable : {loi.mode():,}** · moyenne a posteriori : {loi.moyenne():,.0f}
+
+**Intervalle de crédibilité à 95 % : [{bas:,} ; {haut:,}]** : il y a 95 chances sur 100 que N s'y trouve.
+""".replace(',', ' '))
+                                with profil.section("graphique_a_posteriori"):
+                                    st.vega_lite_chart(loi.courbe(0.95), densite("N", "Probabilité a posteriori"), height=200)
+                                st.caption("Au départ, toutes les valeurs de l'intervalle sont également probables ; "
+                                           "chaque nouveau filet affine la courbe. Zone foncée : l'intervalle à 95 %.")
+
     if st.sidebar.button("🔄 Nouvelle mission mystère"):
-        for key in list(st.session_state.keys()): 
-            del st.session_state[key]
+        # Tout repart de zéro, sauf le module choisi
+        for key in list(st.session_state.keys()):
+            if key != "module":
+                del st.session_state[key]
         st.rerun()
 
 # --- FOOTER PÉDAGOGIQUE ---
@@ -554,3 +845,26 @@ La méthode CMR repose sur l'hypothèse que :
 
 **Formule clé** : Si **p = M/N** (proportion de marqués) = **p' = m/n** (proportion observée), alors **N = (M × n) / m**
 """)
+
+# --- INSTRUMENTATION ---
+if st.sidebar.checkbox("⏱️ Instrumentation", key="instrumentation"):
+    st.sidebar.checkbox("Mesurer aussi les allocations (plus lent)", key="instrumentation_allocations")
+    profil.terminer_passage()
+    duree_passage = profil.dernier_passage.get('total', (0.0, 0))[0]
+    recalculees = sim.vues.recalculees
+    st.sidebar.caption(f"Exécution du script : **{duree_passage:.1f} ms** — version de l'état : {sim.vues.version}")
+    if recalculees:
+        st.sidebar.caption("Vues recalculées : " + ", ".join(f"{nom} ({duree * 1000:.1f} ms)" for nom, duree in recalculees.items()))
+    else:
+        st.sidebar.caption("Vues recalculées : aucune")
+    etat_capacite = capacite.etat()
+    st.sidebar.caption(
+        f"Mémoire de la séance : {sim.nbytes / 2**20:.1f} Mo — serveur : {etat_capacite['memoire'] / 2**20:.0f} / "
+        f"{etat_capacite['memoire_max'] / 2**20:.0f} Mo · {etat_capacite['seances']} séances dont {etat_capacite['endormies']} endormies"
+    )
+    if etat_capacite['sans_effet']:
+        st.sidebar.caption(f"⚠️ {etat_capacite['sans_effet']} mises en sommeil n'ont libéré aucune mémoire")
+    if profil.passages:
+        st.sidebar.caption(f"Sections sur les derniers passages de la session ({profil.passages} mesurés) :")
+        st.sidebar.dataframe(profil.resume(), hide_index=True)
+        st.sidebar.download_button("📥 Exporter les mesures (CSV)", profil.csv(), file_name=f"profil_{profil.session}.csv", mime="text/csv")
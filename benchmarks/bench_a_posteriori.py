@@ -0,0 +1,64 @@
+"""Loi a posteriori de N : coût d'une mise à jour par occasion et des résumés, selon la taille de la grille.
+
+Une séance type : un marquage puis des recaptures successives d'environ 5 %
+de la population. On compare la mise à jour incrémentale (une occasion) au
+recalcul complet sur toutes les occasions, puis on mesure normalisation,
+intervalle de crédibilité et courbe affichée.
+
+Usage : python benchmarks/bench_a_posteriori.py [--occasions 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Simulation
+from cmr.bayesien import LoiAPosteriori
+
+# (N réel, N_min, N_max) : l'intervalle du Module 2, puis des grilles de plus en plus grandes
+CAS = [
+    (1_500, 500, 3_000),
+    (20_000, 1_000, 100_000),
+    (200_000, 10_000, 1_000_000),
+    (2_000_000, 1_000_000, 3_000_000),
+]
+
+
+def chrono_ms(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return (time.perf_counter() - debut) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--occasions", type=int, default=10)
+    args = parser.parse_args()
+
+    for N, N_min, N_max in CAS:
+        sim = Simulation(graine=0)
+        sim.generer(N)
+        sim.marquer(N // 10)
+        historiques = sim.population.historiques
+        loi = LoiAPosteriori(N_min, N_max)
+        loi.mettre_a_jour(historiques)
+        mises_a_jour = []
+        for _ in range(args.occasions):
+            sim.recapturer(N // 20)
+            historiques.par_occasion()
+            mises_a_jour.append(chrono_ms(lambda: loi.mettre_a_jour(historiques)))
+        complet = chrono_ms(lambda: LoiAPosteriori(N_min, N_max).mettre_a_jour(historiques))
+        resumes = chrono_ms(lambda: (loi.moyenne(), loi.intervalle(), loi.courbe()))
+        bas, haut = loi.intervalle()
+        print(f"Grille de {N_max - N_min + 1:>9,} valeurs : mise à jour {np.median(mises_a_jour):6.2f} ms "
+              f"(recalcul complet {complet:7.2f} ms) · résumés {resumes:6.2f} ms · "
+              f"N = {N:,} ∈ [{bas:,}, {haut:,}] après {args.occasions} recaptures")
+
+
+if __name__ == "__main__":
+    main()
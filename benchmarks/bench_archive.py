@@ -0,0 +1,100 @@
+"""Archives : taille et temps d'export/reprise d'une séance, agrégation d'essais projetés en mémoire.
+
+Séances : une grande population (10 % marqués puis une recapture), paresseuse
+puis aux positions explicites (après mélange), enregistrée avec et sans
+compression ; la reprise est vérifiée en rejouant la même action des deux
+côtés. Essais : des millions de recaptures simulées, résumées par blocs depuis
+le fichier, comparées à un chargement complet (pic mémoire mesuré par
+tracemalloc, qui ne voit pas les pages projetées).
+
+Usage : python benchmarks/bench_archive.py [--N 10000000] [--essais 20000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Simulation, simuler_estimations
+from cmr.archive import exporter_essais, exporter_seance, importer_seance, resumer_essais
+
+
+def chrono(fonction):
+    debut = time.perf_counter()
+    resultat = fonction()
+    return resultat, (time.perf_counter() - debut) * 1e3
+
+
+def pic_memoire(fonction):
+    """(résultat, durée en ms, pic d'allocations en Mo)."""
+    tracemalloc.start()
+    resultat, duree = chrono(fonction)
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultat, duree, pic / 2**20
+
+
+def seances(N, dossier):
+    sim = Simulation(graine=0)
+    sim.generer(N)
+    sim.marquer(N // 10)
+    sim.recapturer(N // 20)
+    for etat in ("paresseuse", "positions explicites"):
+        if etat == "positions explicites":
+            sim.melanger(1, 0.05)
+        for compresser in (False, True):
+            chemin = os.path.join(dossier, f"seance_{compresser}.npz")
+            _, ecriture = chrono(lambda: exporter_seance(sim, chemin, compresser=compresser))
+            (reprise, _), lecture = chrono(lambda: importer_seance(chemin))
+            # La séance reprise et l'originale font la même recapture
+            assert reprise.recapturer(1000) == sim.recapturer(1000)
+            assert np.array_equal(reprise.population.historiques.ids, sim.population.historiques.ids)
+            print(f"Séance N = {N:,} ({etat}, {'compressée' if compresser else 'non compressée'}) : "
+                  f"{os.path.getsize(chemin) / 2**20:7.1f} Mo · export {ecriture:7.1f} ms · reprise {lecture:7.1f} ms")
+
+
+def essais(nombre, dossier):
+    chemin = os.path.join(dossier, "essais.npz")
+    resultat = simuler_estimations(2_000, 200, 200, nombre, np.random.default_rng(0))
+    _, ecriture = chrono(lambda: exporter_essais([resultat], chemin))
+    print(f"{nombre:,} essais : {os.path.getsize(chemin) / 2**20:.1f} Mo (m en {np.load(chemin)['m'].dtype}) · export {ecriture:.0f} ms")
+    resultat = None  # les essais simulés ne restent pas en mémoire pendant les mesures
+
+    # Import de pandas payé une fois par processus : hors mesure
+    import_module("pandas")
+
+    resume, duree, pic = pic_memoire(lambda: resumer_essais(chemin))
+    print(f"Résumé par blocs depuis la projection : {duree:7.0f} ms · pic {pic:7.1f} Mo · "
+          f"moyenne {resume.moyenne[0]:,.1f} · P(m = 0) {resume.p_m_nul[0]:.2e}")
+
+    def complet():
+        m = np.load(chemin)['m'].astype(np.int64)
+        valides = m[m > 0]
+        estimations = 200 * 200 / valides
+        return estimations.mean(), estimations.var()
+
+    (moyenne, variance), duree, pic = pic_memoire(complet)
+    print(f"Chargement complet puis résumé          : {duree:7.0f} ms · pic {pic:7.1f} Mo · moyenne {moyenne:,.1f}")
+    assert np.isclose(moyenne, resume.moyenne[0]) and np.isclose(variance, resume.variance[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--N", type=int, default=10_000_000)
+    parser.add_argument("--essais", type=int, default=20_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        seances(args.N, dossier)
+        essais(args.essais, dossier)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Débit du balayage (essais par seconde) en fonction du nombre de processus.
+
+Usage : python benchmarks/bench_balayage.py [--fidele]
+
+``--fidele`` rejoue le protocole complet du Module 1 pour chaque essai
+(génération, marquage, recapture) au lieu du tirage hypergéométrique direct.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cmr.balayage import balayer, grille
+
+POINTS = grille([1_000, 10_000, 50_000], [50, 200, 1_000], [50, 200, 1_000])
+
+
+def main():
+    fidele = "--fidele" in sys.argv
+    essais = 200 if fidele else 200_000
+    taille_lot = 20 if fidele else 20_000
+    total = essais * len(POINTS)
+    processus = sorted({1, 2, 4, os.cpu_count() or 1})
+    reference = None
+    print(f"{len(POINTS)} triplets × {essais:,} essais ({'protocole complet' if fidele else 'hypergéométrique'}), {os.cpu_count()} cœurs")
+    for nombre in processus:
+        debut = time.perf_counter()
+        balayer(POINTS, essais=essais, processus=nombre, fidele=fidele, taille_lot=taille_lot)
+        debit = total / (time.perf_counter() - debut)
+        reference = reference or debit
+        print(f"{nombre:>3} processus : {debit:>14,.0f} essais/s (accélération ×{debit / reference:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Expérience de classe : débit des soumissions concurrentes et coût d'un rafraîchissement du tableau de bord.
+
+Des threads simulent les élèves qui envoient leurs résultats pendant que le
+tableau de bord rattrape les nouveautés ; on compare à une relecture complète.
+
+Usage : python benchmarks/bench_classe.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr.classe import Agregat, DepotClasse
+
+ELEVES = 32
+ENVOIS_PAR_ELEVE = 50
+
+
+def eleve(depot, code, numero, N):
+    rng = np.random.default_rng(numero)
+    for _ in range(ENVOIS_PAR_ELEVE):
+        M, n = int(rng.integers(50, 300)), int(rng.integers(50, 300))
+        depot.soumettre(code, f"eleve{numero}", M, n, int(rng.hypergeometric(M, N - M, n)))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as dossier:
+        depot = DepotClasse(os.path.join(dossier, "classe.sqlite"))
+        code, cle = depot.creer_experience(np.random.default_rng(0))
+        experience = depot.experience_enseignant(code, cle)
+        agregat = Agregat(experience)
+        rafraichissements = []
+
+        eleves = [threading.Thread(target=eleve, args=(depot, code, i, experience.N)) for i in range(ELEVES)]
+        debut = time.perf_counter()
+        for fil in eleves:
+            fil.start()
+        while any(fil.is_alive() for fil in eleves):
+            t0 = time.perf_counter()
+            agregat.rattraper(depot)
+            rafraichissements.append((time.perf_counter() - t0) * 1e3)
+            time.sleep(0.01)
+        duree = time.perf_counter() - debut
+        agregat.rattraper(depot)
+
+        total = ELEVES * ENVOIS_PAR_ELEVE
+        print(f"{total:,} soumissions de {ELEVES} élèves en {duree:.2f} s ({total / duree * 60:,.0f} par minute)")
+        print(f"Rafraîchissement incrémental : médiane {np.median(rafraichissements):.2f} ms, "
+              f"max {np.max(rafraichissements):.2f} ms sur {len(rafraichissements)} rafraîchissements")
+        t0 = time.perf_counter()
+        complet = Agregat(experience)
+        complet.rattraper(depot)
+        print(f"Relecture complète : {(time.perf_counter() - t0) * 1e3:.2f} ms")
+        print(f"N = {experience.N:,} · moyenne {agregat.moyenne:,.0f} · estimation commune {agregat.estimation_commune:,.0f} "
+              f"({agregat.sans_recapture} envois avec m = 0)")
+        assert agregat.soumissions == complet.soumissions == total
+        assert np.isclose(agregat.moyenne, complet.moyenne) and np.isclose(agregat.ecart_type, complet.ecart_type)
+
+
+if __name__ == "__main__":
+    main()
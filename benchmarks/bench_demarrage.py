@@ -0,0 +1,77 @@
+"""Démarrage de l'application : temps jusqu'au premier affichage et temps du script à chaque passage.
+
+Le premier affichage est mesuré dans un interpréteur neuf (imports compris,
+hors import de Streamlit lui-même, payé une fois par serveur). Les passages
+suivants sont chronométrés par le profileur de l'application, sur la page
+d'accueil puis sur une séance en cours du Module 1 (population générée,
+marquage et recapture faits).
+
+Usage : python benchmarks/bench_demarrage.py [--repetitions 5] [--passages 20]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MESURE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+def chrono(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return (time.perf_counter() - debut) * 1e3
+
+def passages():
+    # Durée du script mesurée par le profileur de l'application (sans l'attente d'AppTest)
+    durees = []
+    for _ in range(PASSAGES):
+        appli.run()
+        durees.append(appli.session_state.profil.dernier_passage["total"][0])
+    return durees
+
+appli = AppTest.from_file("app.py", default_timeout=60)
+premier = chrono(appli.run)
+resultat = {"premier": premier, "pandas": "pandas" in sys.modules}
+appli.session_state.instrumentation = True
+resultat["accueil"] = passages()
+appli.button[0].click().run()
+[b for b in appli.button if b.key == "btn_m1_M"][0].click().run()
+[b for b in appli.button if b.key == "btn_m1_n"][0].click().run()
+assert not appli.exception, appli.exception
+resultat["seance"] = passages()
+print(json.dumps(resultat))
+"""
+
+
+def mesurer(passages):
+    sortie = subprocess.run(
+        [sys.executable, "-c", _MESURE.replace("PASSAGES", str(passages))],
+        cwd=RACINE, capture_output=True, text=True, check=True,
+    )
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--passages", type=int, default=20)
+    args = parser.parse_args()
+
+    mesures = [mesurer(args.passages) for _ in range(args.repetitions)]
+    premiers = [mesure["premier"] for mesure in mesures]
+    print(f"Premier affichage     : médiane {np.median(premiers):7.1f} ms (min {min(premiers):.1f}, max {max(premiers):.1f})"
+          f" · pandas chargé : {'oui' if mesures[0]['pandas'] else 'non'}")
+    for cle, libelle in (("accueil", "Passage page d'accueil"), ("seance", "Passage séance en cours")):
+        durees = np.concatenate([mesure[cle] for mesure in mesures])
+        print(f"{libelle:<22}: médiane {np.median(durees):7.1f} ms · p95 {np.percentile(durees, 95):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
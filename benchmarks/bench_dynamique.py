@@ -0,0 +1,38 @@
+"""Temps d'un pas de temps de population ouverte (mortalité, émigration, naissances, perte de marques).
+
+Population paresseuse (positions déduites de la graine) puis aux positions explicites (après mélange).
+
+Usage : python benchmarks/bench_dynamique.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Population
+from cmr.dynamique import Dynamique, pas_de_temps
+
+TAILLES = [50_000, 1_000_000, 10_000_000]
+DYNAMIQUE = Dynamique(survie=0.9, emigration=0.05, recrutement=0.15, perte_marque=0.1)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for N in TAILLES:
+        for explicite in (False, True):
+            population = Population(N, rng)
+            population.capturer(population.tirer_non_marques(N // 10, rng), aleatoire=False)
+            if explicite:
+                population.x
+            debut = time.perf_counter()
+            bilan = pas_de_temps(population, DYNAMIQUE, rng)
+            duree = (time.perf_counter() - debut) * 1e3
+            print(f"N={N:>11,} {'explicite ' if explicite else 'paresseuse'} : {duree:7.1f} ms ({bilan})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Captures successives : enregistrement des historiques et estimateurs de Schnabel à N = 10^6, K = 20.
+
+Usage : python benchmarks/bench_historiques.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Population
+
+CAS = [(50_000, 10, 1_000), (1_000_000, 20, 10_000), (1_000_000, 20, 50_000)]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for N, K, n in CAS:
+        population = Population(N, rng)
+        debut = time.perf_counter()
+        for _ in range(K):
+            population.capturer(population.tirer(n, rng))
+        enregistrement = (time.perf_counter() - debut) * 1e3
+        historiques = population.historiques
+        debut = time.perf_counter()
+        schnabel, se = historiques.schnabel(), historiques.schumacher_eschmeyer()
+        estimation = (time.perf_counter() - debut) * 1e3
+        print(f"N={N:>9,} K={K} n={n:>6,} : {K} occasions en {enregistrement:6.1f} ms, estimateurs en {estimation:5.1f} ms "
+              f"(Schnabel {schnabel:,.0f}, S-E {se:,.0f}, {historiques.nbytes / 1e6:.1f} Mo d'historiques)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Temps du mélange (marche aléatoire) : objectif ~1 s pour 100 pas à N = 10^6.
+
+Usage : python benchmarks/bench_melange.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cmr import Simulation
+
+CAS = [(50_000, 100), (1_000_000, 10), (1_000_000, 100)]
+
+
+def main():
+    for N, pas in CAS:
+        sim = Simulation(graine=0)
+        sim.generer(N)
+        debut = time.perf_counter()
+        sim.melanger(pas, 0.02)
+        duree = time.perf_counter() - debut
+        print(f"N={N:>9,} pas={pas:>3} : {duree * 1e3:8.1f} ms ({duree / pas * 1e3:.2f} ms par pas)")
+
+
+if __name__ == "__main__":
+    main()
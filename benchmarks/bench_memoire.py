@@ -0,0 +1,59 @@
+"""Mémoire par session en fonction de N : liste de dictionnaires vs Population compacte (10 % de marqués).
+
+La Population paresseuse ne stocke que les indices marqués : son coût suit M,
+pas N. La dernière colonne montre le coût une fois les positions rendues
+explicites (après un mélange).
+
+Usage : python benchmarks/bench_memoire.py
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Population
+
+TAILLES = [1_000, 10_000, 50_000, 200_000, 1_000_000]
+
+
+def memoire_pic(fabrique):
+    tracemalloc.start()
+    objet = fabrique()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objet
+    return pic
+
+
+def ancienne_population(N):
+    poissons = [{'id': i, 'marque': False} for i in range(N)]
+    coords = {'x': [random.random() for _ in range(N)], 'y': [random.random() for _ in range(N)]}
+    return poissons, coords
+
+
+def population_marquee(N, rng):
+    population = Population(N, rng)
+    population.marquer(population.tirer_non_marques(N // 10, rng))
+    return population
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'N':>10} | {'liste de dicts':>15} | {'Population':>12} | {'octets/marqué':>13} | {'gain':>6} | {'explicite':>10}")
+    for N in TAILLES:
+        ancien = memoire_pic(lambda: ancienne_population(N))
+        population = population_marquee(N, rng)
+        nouveau = population.nbytes
+        population.x
+        explicite = population.nbytes
+        print(f"{N:>10,} | {ancien / 1e6:>12.1f} Mo | {nouveau / 1e6:>9.2f} Mo | {nouveau / (N // 10):>13.2f} | "
+              f"{ancien / nouveau:>5.0f}x | {explicite / 1e6:>7.2f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Temps de la répétition vectorisée de la recapture (objectif : < 200 ms pour 10^5 répétitions à N = 50 000).
+
+Usage : python benchmarks/bench_montecarlo.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import simuler_estimations
+
+CAS = [(50_000, 500, 500), (50_000, 5_000, 5_000), (50_000, 10_000, 10_000), (10_000_000, 100_000, 100_000)]
+
+
+def main():
+    for repetitions in (10_000, 100_000):
+        for N, M, n in CAS:
+            debut = time.perf_counter()
+            resultat = simuler_estimations(N, M, n, repetitions, np.random.default_rng(0))
+            duree = (time.perf_counter() - debut) * 1e3
+            print(f"N={N:>10,} M={M:>7,} n={n:>7,} répétitions={repetitions:>7,} : {duree:7.1f} ms "
+                  f"(biais {resultat.biais:+.1f}, écart-type {resultat.ecart_type:.1f}, P(m=0) {resultat.p_m_nul:.3f})")
+
+
+if __name__ == "__main__":
+    main()
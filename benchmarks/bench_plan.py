@@ -0,0 +1,41 @@
+"""Recherche du plan optimal (M, n) : temps de réponse, avec et sans mémoïsation.
+
+Usage : python benchmarks/bench_plan.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cmr.plan import plan_optimal
+
+# (N_min, N_max, cv_max, p_m_nul_max, plafond) ; plafond = budget du boss à 20 % de N_min
+CAS = [
+    (1_000, 1_000, 0.10, 0.01, 200),
+    (10_000, 10_000, 0.05, None, 2_000),
+    (500, 3_000, 0.10, 0.01, None),
+    (500, 3_000, 0.20, 0.01, 100),
+    (1_000_000, 1_000_000, 0.02, None, 200_000),
+    (10_000_000, 10_000_000, 0.01, None, 2_000_000),
+]
+
+
+def main():
+    plan_optimal(1_000, None, 0.1)
+    for N_min, N_max, cv_max, p_m_nul_max, plafond in CAS:
+        plan_optimal.cache_clear()
+        debut = time.perf_counter()
+        plan = plan_optimal(N_min, N_max, cv_max, p_m_nul_max, plafond, plafond)
+        froid = (time.perf_counter() - debut) * 1e3
+        debut = time.perf_counter()
+        plan_optimal(N_min, N_max, cv_max, p_m_nul_max, plafond, plafond)
+        memoise = (time.perf_counter() - debut) * 1e6
+        resultat = "aucun plan" if plan is None else f"M={plan.M:,} n={plan.n:,} (cv {plan.cv:.3f}, P(m=0) {plan.p_m_nul:.2g})"
+        print(f"N ∈ [{N_min:,}, {N_max:,}] cv ≤ {cv_max} P(m=0) ≤ {p_m_nul_max} plafond {plafond} : "
+              f"{froid:7.1f} ms, mémoïsé {memoise:5.1f} µs → {resultat}")
+
+
+if __name__ == "__main__":
+    main()
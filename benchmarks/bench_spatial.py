@@ -0,0 +1,44 @@
+"""Recherche des poissons d'une zone : index en grille vs parcours complet (objectif : < 1 ms à N = 10^6).
+
+Usage : python benchmarks/bench_spatial.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Population
+from cmr.spatial import Zone
+
+TAILLES = [50_000, 1_000_000, 10_000_000]
+RAYONS = [0.02, 0.05, 0.1]
+
+
+def chrono(fonction, repetitions=20):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) * 1e3 / repetitions
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for N in TAILLES:
+        population = Population(N, rng)
+        debut = time.perf_counter()
+        population.grille
+        construction = (time.perf_counter() - debut) * 1e3
+        print(f"N={N:>11,} : construction de la grille {construction:7.1f} ms ({population.grille.nbytes / 1e6:.1f} Mo)")
+        for rayon in RAYONS:
+            zone = Zone(0.4, 0.6, rayon)
+            grille = chrono(lambda: population.dans_zone(zone))
+            parcours = chrono(lambda: np.flatnonzero(zone.contient(population.x, population.y)), repetitions=5)
+            print(f"    rayon {rayon:.2f} ({len(population.dans_zone(zone)):>7,} poissons) : grille {grille:7.3f} ms, parcours complet {parcours:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
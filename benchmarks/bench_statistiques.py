@@ -0,0 +1,31 @@
+"""Temps des statistiques exactes (objectif : < 50 ms jusqu'à N = 10^6), premier appel puis appel mémoïsé.
+
+Usage : python benchmarks/bench_statistiques.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cmr.statistiques import percentile_resultat, statistiques_exactes
+
+CAS = [(10_000, 1_000, 1_000), (50_000, 5_000, 10_000), (1_000_000, 100_000, 200_000), (1_000_000, 200_000, 200_000)]
+
+
+def chrono(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return (time.perf_counter() - debut) * 1e3
+
+
+def main():
+    for N, M, n in CAS:
+        premier = chrono(lambda: (statistiques_exactes(N, M, n), percentile_resultat(N, M, n, M * n // N)))
+        suivant = chrono(lambda: (statistiques_exactes(N, M, n), percentile_resultat(N, M, n, M * n // N)))
+        print(f"N={N:>9,} M={M:>7,} n={n:>7,} : premier appel {premier:6.1f} ms, appel mémoïsé {suivant:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
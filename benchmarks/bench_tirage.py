@@ -0,0 +1,61 @@
+"""Marquage et recapture : ancien parcours de liste vs tirage vectorisé en O(k).
+
+Usage : python benchmarks/bench_tirage.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cmr import Population
+
+TAILLES = [10_000, 50_000, 1_000_000, 10_000_000]
+# L'ancien chemin devient inutilisable au-delà (plusieurs Go de dictionnaires)
+TAILLE_MAX_ANCIEN = 1_000_000
+
+
+def chrono(fonction, repetitions=5):
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur * 1e3
+
+
+def ancien_marquage(poissons, quantite):
+    non_marques = [p for p in poissons if not p['marque']]
+    return random.sample(non_marques, min(quantite, len(non_marques)))
+
+
+def ancienne_recapture(poissons, quantite):
+    indices = random.sample(range(len(poissons)), min(quantite, len(poissons)))
+    return sum(1 for i in indices if poissons[i]['marque'])
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'N':>11} | {'k':>6} | {'marquage ancien':>15} | {'marquage O(k)':>13} | {'recapture ancienne':>18} | {'recapture O(k)':>14}")
+    for N in TAILLES:
+        k = max(N // 100, 100)
+        population = Population(N, rng)
+        population.marquer(population.tirer_non_marques(N // 10, rng))
+        nouveau_m = chrono(lambda: population.tirer_non_marques(k, rng))
+        nouveau_r = chrono(lambda: int(population.est_marque(population.tirer(k, rng)).sum()))
+        if N <= TAILLE_MAX_ANCIEN:
+            poissons = [{'id': i, 'marque': i % 10 == 0} for i in range(N)]
+            ancien_m = f"{chrono(lambda: ancien_marquage(poissons, k)):>12.2f} ms"
+            ancien_r = f"{chrono(lambda: ancienne_recapture(poissons, k)):>15.2f} ms"
+            del poissons
+        else:
+            ancien_m, ancien_r = f"{'-':>15}", f"{'-':>18}"
+        print(f"{N:>11,} | {k:>6,} | {ancien_m} | {nouveau_m:>10.2f} ms | {ancien_r} | {nouveau_r:>11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
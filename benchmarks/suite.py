@@ -0,0 +1,135 @@
+"""Suite de benchmarks du cœur de simulation, avec références JSON et détection de régressions.
+
+Mesure, pour chaque N, le temps (meilleur de plusieurs répétitions) et le pic
+mémoire (tracemalloc, qui suit aussi les allocations NumPy) de :
+génération de la population, marquage, recapture, préparation de la vue du lagon
+et recherche du plan optimal (± 5 %, budget de 20 % de N) sans mémoïsation.
+
+Usage :
+    python benchmarks/suite.py --enregistrer      # mesure et écrit la référence
+    python benchmarks/suite.py                    # compare à la référence (code de sortie 1 si régression)
+    python benchmarks/suite.py --tailles 1000 50000 --seuil 0.5
+
+La référence dépend de la machine : elle n'est pas versionnée, chaque poste
+enregistre la sienne avant de comparer.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cmr import Simulation
+from cmr.plan import plan_optimal
+
+TAILLES = [1_000, 50_000, 1_000_000, 10_000_000]
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference.json")
+# Une mesure est une régression si elle dépasse la référence de plus de ce facteur
+SEUIL = 0.25
+# En dessous, le bruit de mesure domine : on ne signale pas de régression en temps
+TEMPS_MINIMAL_MS = 1.0
+
+
+def mesurer(preparer, action, repetitions):
+    """Meilleur temps (ms) et pic mémoire (octets) de ``action(preparer())``.
+
+    Le temps est pris sans tracemalloc (qui ralentit les allocations), le pic
+    mémoire lors d'un passage séparé.
+    """
+    action(preparer())  # échauffement : imports paresseux, caches
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        etat = preparer()
+        debut = time.perf_counter()
+        action(etat)
+        meilleur = min(meilleur, (time.perf_counter() - debut) * 1e3)
+    etat = preparer()
+    tracemalloc.start()
+    action(etat)
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"temps_ms": meilleur, "memoire_octets": pic}
+
+
+def cas(N):
+    """Les opérations mesurées pour une population de taille N, avec M = n = N / 10."""
+    k = max(N // 10, 1)
+
+    def neuve():
+        return Simulation(graine=0)
+
+    def generee():
+        sim = Simulation(graine=0)
+        sim.generer(N)
+        return sim
+
+    def marquee():
+        sim = generee()
+        sim.marquer(k)
+        return sim
+
+    return {
+        "generation": (neuve, lambda sim: sim.generer(N)),
+        "marquage": (generee, lambda sim: sim.marquer(k)),
+        "recapture": (marquee, lambda sim: sim.recapturer(k)),
+        "vue_lagon": (marquee, lambda sim: sim.vue_lagon()),
+        "plan_optimal": (plan_optimal.cache_clear, lambda _: plan_optimal(N, None, 0.05, None, N // 5, N // 5)),
+    }
+
+
+def executer(tailles):
+    resultats = {}
+    for N in tailles:
+        repetitions = 7 if N <= 1_000_000 else 3
+        for nom, (preparer, action) in cas(N).items():
+            cle = f"{nom}[N={N}]"
+            resultats[cle] = mesurer(preparer, action, repetitions)
+            print(f"{cle:<28} {resultats[cle]['temps_ms']:>10.2f} ms {resultats[cle]['memoire_octets'] / 1e6:>10.2f} Mo")
+    return resultats
+
+
+def comparer(resultats, reference, seuil):
+    regressions = []
+    for cle, mesure in resultats.items():
+        if cle not in reference:
+            continue
+        avant = reference[cle]
+        if mesure["temps_ms"] > TEMPS_MINIMAL_MS and mesure["temps_ms"] > avant["temps_ms"] * (1 + seuil):
+            regressions.append(f"{cle} : temps {avant['temps_ms']:.2f} → {mesure['temps_ms']:.2f} ms")
+        if mesure["memoire_octets"] > avant["memoire_octets"] * (1 + seuil):
+            regressions.append(f"{cle} : mémoire {avant['memoire_octets'] / 1e6:.2f} → {mesure['memoire_octets'] / 1e6:.2f} Mo")
+    return regressions
+
+
+def main():
+    parseur = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parseur.add_argument("--tailles", type=int, nargs="+", default=TAILLES)
+    parseur.add_argument("--reference", default=REFERENCE)
+    parseur.add_argument("--seuil", type=float, default=SEUIL, help="tolérance relative avant de signaler une régression")
+    parseur.add_argument("--enregistrer", action="store_true", help="écrit les mesures comme nouvelle référence")
+    arguments = parseur.parse_args()
+
+    resultats = executer(arguments.tailles)
+    if arguments.enregistrer:
+        with open(arguments.reference, "w", encoding="utf-8") as fichier:
+            json.dump(resultats, fichier, indent=2, sort_keys=True)
+        print(f"Référence enregistrée dans {arguments.reference}")
+        return 0
+    if not os.path.exists(arguments.reference):
+        print(f"Pas de référence ({arguments.reference}) : relancer avec --enregistrer")
+        return 0
+    with open(arguments.reference, encoding="utf-8") as fichier:
+        regressions = comparer(resultats, json.load(fichier), arguments.seuil)
+    for regression in regressions:
+        print(f"RÉGRESSION {regression}")
+    if not regressions:
+        print(f"Aucune régression au-delà de {arguments.seuil:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
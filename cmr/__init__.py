@@ -0,0 +1,33 @@
+"""Cœur de simulation CMR (Capture-Marquage-Recapture), indépendant de l'interface.
+
+Les noms publics sont importés à la demande : ``import cmr`` ne charge ni
+pandas ni les modules de calcul tant qu'on ne s'en sert pas.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "Population": "cmr.population",
+    "ResultatMonteCarlo": "cmr.montecarlo",
+    "Simulation": "cmr.simulation",
+    "balayer": "cmr.balayage",
+    "creer_generateur": "cmr.aleatoire",
+    "flux_sautes": "cmr.aleatoire",
+    "grille": "cmr.balayage",
+    "simuler_estimations": "cmr.montecarlo",
+    "sous_flux": "cmr.aleatoire",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(nom):
+    if nom not in _EXPORTS:
+        raise AttributeError(f"module 'cmr' has no attribute {nom!r}")
+    valeur = getattr(import_module(_EXPORTS[nom]), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,61 @@
+"""Générateurs aléatoires reproductibles : un flux PCG64 par session, sous-flux indépendants pour le calcul parallèle."""
+
+import numpy as np
+
+
+def nouvelle_graine():
+    """Graine de 32 bits tirée de l'entropie du système (assez courte pour être recopiée)."""
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def creer_generateur(graine=None):
+    """Renvoie ``(graine, Generator PCG64)`` ; une graine est tirée au hasard si aucune n'est fournie."""
+    graine = nouvelle_graine() if graine is None else int(graine)
+    return graine, np.random.Generator(np.random.PCG64(graine))
+
+
+def sous_flux(graine, nombre):
+    """``nombre`` générateurs statistiquement indépendants dérivés de ``graine`` (SeedSequence.spawn).
+
+    Le i-ème flux ne dépend que de (graine, i) : un calcul réparti sur des
+    processus donne le même résultat quel que soit le nombre de processus.
+    """
+    return [np.random.Generator(np.random.PCG64(s)) for s in np.random.SeedSequence(graine).spawn(nombre)]
+
+
+def flux_sautes(graine, nombre):
+    """``nombre`` générateurs sur le même flux PCG64, le i-ème avancé de i × (φ − 1)·2^128 ≈ i × 2,1·10^38 tirages (jump-ahead)."""
+    bit_generator = np.random.PCG64(graine)
+    return [np.random.Generator(bit_generator.jumped(i)) for i in range(nombre)]
+
+
+# Constantes de SplitMix64 (Steele, Lea & Flood 2014)
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MELANGE_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MELANGE_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(z):
+    """Fonction de mélange de SplitMix64, en place sur un tableau uint64."""
+    z ^= z >> np.uint64(30)
+    z *= _MELANGE_1
+    z ^= z >> np.uint64(27)
+    z *= _MELANGE_2
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def uniformes_indexees(graine, indices, flux=0):
+    """Uniformes float32 sur [0, 1[ fonctions pures de (graine, flux, indice) : générateur à compteur.
+
+    Le i-ème tirage se calcule sans produire les précédents ; une population
+    peut ainsi retrouver la position de n'importe quel poisson à partir de
+    son numéro, sans garder de tableau de taille N.
+    """
+    cle = _splitmix64(np.array([(int(graine) + (flux + 1) * int(_GAMMA)) % 2**64], dtype=np.uint64))
+    compteurs = np.array(indices, dtype=np.uint64)
+    compteurs *= _GAMMA
+    compteurs += cle[0]
+    # 24 bits de poids fort : exactement représentables en float32, donc strictement < 1
+    compteurs = _splitmix64(compteurs) >> np.uint64(40)
+    return compteurs.astype(np.float32) * np.float32(2.0**-24)
@@ -0,0 +1,279 @@
+"""Archives de séances et d'essais : export compact, relecture projetée en mémoire.
+
+Une archive est un fichier ``.npz`` ordinaire (``np.load`` sait le lire) : une
+colonne par membre ``.npy``, plus ``meta``, un dictionnaire JSON rangé dans un
+tableau de texte. Les entiers sont stockés dans le plus petit type qui les
+contient (``compacter``).
+
+Sans compression (par défaut), les colonnes sont rangées telles quelles dans
+le ZIP : ``Archive`` les projette en mémoire (``np.memmap``) sans les lire, et
+seules les pages parcourues sont chargées. Avec ``compresser=True`` le fichier
+est plus petit (téléchargement depuis l'application) mais les colonnes
+entières sont décompressées à la lecture ; les colonnes flottantes restent
+non compressées.
+
+    exporter_seance(sim, "seance.npz")
+    sim, etat_app = importer_seance("seance.npz")      # même état, générateur compris
+
+    exporter_essais([simuler_estimations(N, M, n, 10**7)], "essais.npz")
+    resumer_essais("essais.npz")                        # par blocs, sans tout charger
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import struct
+import zipfile
+from dataclasses import asdict
+
+import numpy as np
+
+from cmr.dynamique import BilanPas
+from cmr.historiques import Historiques
+from cmr.population import Population
+from cmr.simulation import Simulation
+from cmr.statistiques import fusionner_moments
+
+VERSION_FORMAT = 1
+# Niveau de zlib : presque aussi compact que le niveau par défaut (6) sur ces tableaux, plusieurs fois plus rapide
+NIVEAU_COMPRESSION = 1
+# Essais lus à la fois par ``resumer_essais``
+TAILLE_BLOC = 1 << 20
+
+# En-tête local d'un membre ZIP (30 octets) ; les deux derniers champs sont les
+# longueurs du nom et du champ « extra », qui précèdent les données
+_EN_TETE_LOCAL = struct.Struct("<4s5H3L2H")
+
+
+def compacter(tableau):
+    """Même contenu dans le plus petit type entier qui le contient (inchangé si non entier ou vide)."""
+    tableau = np.asarray(tableau)
+    if tableau.dtype.kind not in "iu" or tableau.size == 0:
+        return tableau
+    return tableau.astype(np.result_type(np.min_scalar_type(tableau.min()), np.min_scalar_type(tableau.max())), copy=False)
+
+
+def ecrire_archive(destination, colonnes, meta, compresser=False):
+    """Écrit ``colonnes`` (nom → tableau) et ``meta`` dans ``destination`` (chemin ou fichier binaire).
+
+    Sans ``destination``, renvoie le contenu de l'archive (octets).
+    """
+    if destination is None:
+        tampon = io.BytesIO()
+        ecrire_archive(tampon, colonnes, meta, compresser)
+        return tampon.getvalue()
+    with zipfile.ZipFile(destination, "w", allowZip64=True, compresslevel=NIVEAU_COMPRESSION) as archive:
+        for nom, tableau in {**colonnes, "meta": np.array(json.dumps({"version_format": VERSION_FORMAT, **meta}))}.items():
+            tableau = np.asanyarray(tableau)
+            # Les flottants (positions tirées au hasard) ne se compressent presque pas :
+            # rangés tels quels, ils restent projetables même dans une archive compressée
+            compresse = compresser and tableau.dtype.kind != "f"
+            archive.compression = zipfile.ZIP_DEFLATED if compresse else zipfile.ZIP_STORED
+            with archive.open(f"{nom}.npy", "w", force_zip64=True) as membre:
+                np.lib.format.write_array(membre, tableau, allow_pickle=False)
+
+
+class Archive:
+    """Archive ouverte en lecture : ``meta`` tout de suite, les colonnes à la demande.
+
+    ``archive[nom]`` projette la colonne en mémoire quand la source est un
+    chemin et la colonne non compressée : en lecture seule (``mode="r"``), ou
+    en copie à l'écriture (``mode="c"`` : modifiable, le fichier ne change
+    pas). Sinon la colonne est lue en mémoire.
+    """
+
+    def __init__(self, source, mode="r"):
+        self.source = io.BytesIO(source) if isinstance(source, bytes) else source
+        self.mode = mode
+        self._zip = zipfile.ZipFile(self.source)
+        self.colonnes = sorted(nom[:-4] for nom in self._zip.namelist() if nom != "meta.npy")
+        with self._zip.open("meta.npy") as membre:
+            self.meta = json.loads(str(np.lib.format.read_array(membre, allow_pickle=False)))
+        if self.meta.get("version_format", 0) > VERSION_FORMAT:
+            raise ValueError("archive écrite par une version plus récente du simulateur")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erreur):
+        self.fermer()
+
+    def fermer(self):
+        """Ferme le ZIP ; les colonnes déjà projetées restent utilisables."""
+        self._zip.close()
+
+    def __contains__(self, nom):
+        return nom in self.colonnes
+
+    def __getitem__(self, nom):
+        info = self._zip.getinfo(f"{nom}.npy")
+        if info.compress_type == zipfile.ZIP_STORED and isinstance(self.source, (str, os.PathLike)):
+            return self._projeter(info)
+        with self._zip.open(info) as membre:
+            return np.lib.format.read_array(membre, allow_pickle=False)
+
+    def _projeter(self, info):
+        with open(self.source, "rb") as fichier:
+            fichier.seek(info.header_offset)
+            *_, longueur_nom, longueur_extra = _EN_TETE_LOCAL.unpack(fichier.read(_EN_TETE_LOCAL.size))
+            fichier.seek(info.header_offset + _EN_TETE_LOCAL.size + longueur_nom + longueur_extra)
+            version = np.lib.format.read_magic(fichier)
+            if version == (1, 0):
+                forme, fortran, dtype = np.lib.format.read_array_header_1_0(fichier)
+            elif version == (2, 0):
+                forme, fortran, dtype = np.lib.format.read_array_header_2_0(fichier)
+            else:
+                raise ValueError(f"version {version} du format .npy non prise en charge")
+            debut = fichier.tell()
+        if dtype.hasobject:
+            raise ValueError("les archives ne contiennent pas d'objets Python")
+        if math.prod(forme) == 0:
+            return np.empty(forme, dtype=dtype)
+        # np.asarray : un ndarray ordinaire, qui garde la projection vivante par sa base
+        return np.asarray(np.memmap(self.source, dtype=dtype, mode=self.mode, offset=debut, shape=forme, order="F" if fortran else "C"))
+
+
+def _ouvrir(source, mode="r"):
+    """Archive à utiliser dans un ``with`` : une archive déjà ouverte par l'appelant n'est pas refermée."""
+    return contextlib.nullcontext(source) if isinstance(source, Archive) else Archive(source, mode)
+
+
+# --- SÉANCES ---
+def exporter_seance(sim, destination=None, etat_app=None, compresser=False):
+    """Enregistre tout l'état de ``sim`` : graines, état du générateur, population, comptes et filet.
+
+    ``etat_app`` : dictionnaire JSON de l'état de l'interface à restaurer avec
+    la séance (étape, module...). Les vues dérivées ne sont pas enregistrées :
+    elles se recalculent. Une séance dont N est caché (``sim.N_secret``) est
+    refusée : graines, positions et numéros des poissons le révéleraient.
+    """
+    if sim.N_secret:
+        raise ValueError("une séance dont N est caché ne s'enregistre pas : l'archive révélerait N")
+    instantane = sim.population.instantane()
+    historiques = instantane['historiques']
+    colonnes = {
+        'marques': compacter(instantane['marques']),
+        'historiques_ids': compacter(historiques.ids),
+        'historiques_masques': compacter(historiques.masques),
+        'indices_lagon': compacter(sim.indices_lagon),
+    }
+    if instantane['positions'] is not None:
+        colonnes['x'], colonnes['y'] = instantane['positions']
+    if instantane['origines'] is not None:
+        colonnes['origines'] = compacter(instantane['origines'])
+    if sim.filet is not None:
+        colonnes.update({f"filet_{cle}": valeurs for cle, valeurs in sim.filet.items()})
+    meta = {
+        'type': "seance",
+        'graine': sim.graine,
+        'generateur': sim.rng.bit_generator.state,
+        'version': sim.version,
+        'M': sim.M, 'n': sim.n, 'm': sim.m,
+        'population': {
+            'N': int(instantane['N']), 'graine': int(instantane['graine']),
+            'K': historiques.K, 'marquantes': historiques.marquantes, 'aleatoires': historiques.aleatoires,
+        },
+        'bilan_temps': None if sim.bilan_temps is None else asdict(sim.bilan_temps),
+        'app': etat_app or {},
+    }
+    return ecrire_archive(destination, colonnes, meta, compresser)
+
+
+def importer_seance(source):
+    """Reconstruit exactement la séance enregistrée ; renvoie ``(sim, etat_app)``.
+
+    Le générateur reprend là où il s'était arrêté : les mêmes actions donnent
+    ensuite les mêmes résultats que dans la séance d'origine. Depuis un
+    fichier non compressé, les grands tableaux (positions, marques) sont
+    projetés en mémoire en copie à l'écriture plutôt que lus.
+    """
+    with _ouvrir(source, mode="c") as archive:
+        meta = archive.meta
+        if meta.get('type') != "seance":
+            raise ValueError("ce fichier n'est pas une séance enregistrée")
+        decrite = meta['population']
+        historiques = Historiques()
+        historiques.ids = np.asarray(archive['historiques_ids'], dtype=np.int64)
+        historiques.masques = np.asarray(archive['historiques_masques'], dtype=np.uint64)
+        historiques.K = decrite['K']
+        historiques.marquantes = decrite['marquantes']
+        historiques.aleatoires = decrite['aleatoires']
+
+        sim = Simulation(meta['graine'])
+        sim.rng.bit_generator.state = meta['generateur']
+        sim.population = Population.depuis_instantane({
+            'N': decrite['N'],
+            'graine': decrite['graine'],
+            'marques': np.asarray(archive['marques'], dtype=np.int64),
+            'historiques': historiques,
+            'positions': (archive['x'], archive['y']) if 'x' in archive else None,
+            'origines': archive['origines'] if 'origines' in archive else None,
+        })
+        sim.indices_lagon = np.asarray(archive['indices_lagon'], dtype=np.int64)
+        sim.M, sim.n, sim.m = meta['M'], meta['n'], meta['m']
+        if 'filet_x' in archive:
+            sim.filet = {cle: archive[f"filet_{cle}"] for cle in ('x', 'y', 'marques')}
+        sim.bilan_temps = None if meta['bilan_temps'] is None else BilanPas(**meta['bilan_temps'])
+        sim.vues.version = meta['version']
+    return sim, meta['app']
+
+
+# --- ESSAIS EN LOT ---
+def exporter_essais(resultats, destination=None, compresser=False):
+    """Enregistre les valeurs de m de plusieurs ``ResultatMonteCarlo``, une série par triplet (N, M, n).
+
+    Les estimations ne sont pas stockées : elles se déduisent de m.
+    """
+    series = [{'N': r.N, 'M': r.M, 'n': r.n, 'essais': len(r.m)} for r in resultats]
+    m = compacter(np.concatenate([r.m for r in resultats])) if resultats else np.empty(0, dtype=np.uint8)
+    return ecrire_archive(destination, {'m': m}, {'type': "essais", 'series': series}, compresser)
+
+
+def resumer_essais(source, taille_bloc=TAILLE_BLOC):
+    """DataFrame des résumés de chaque série (comme ``ResultatMonteCarlo``), lu par blocs.
+
+    La colonne m est parcourue ``taille_bloc`` essais à la fois : la mémoire
+    utilisée ne dépend pas du nombre d'essais enregistrés.
+    """
+    import pandas as pd
+
+    with _ouvrir(source) as archive:
+        if archive.meta.get('type') != "essais":
+            raise ValueError("ce fichier ne contient pas d'essais")
+        m = archive['m']
+        lignes = []
+        debut = 0
+        for serie in archive.meta['series']:
+            N, M, n, essais = serie['N'], serie['M'], serie['n'], serie['essais']
+            cumul = (0, 0.0, 0.0)
+            for bloc in range(debut, debut + essais, taille_bloc):
+                valeurs = m[bloc:min(bloc + taille_bloc, debut + essais)]
+                valeurs = valeurs[valeurs > 0]
+                cumul = fusionner_moments(cumul, M * n / valeurs.astype(np.float64))
+            debut += essais
+            valides, moyenne, m2 = cumul
+            moyenne = moyenne if valides else np.nan
+            variance = m2 / valides if valides else np.nan
+            lignes.append({
+                'N': N, 'M': M, 'n': n, 'essais': essais,
+                'p_m_nul': 1.0 - valides / essais if essais else np.nan,
+                'moyenne': moyenne, 'biais': moyenne - N,
+                'variance': variance, 'ecart_type': np.sqrt(variance),
+            })
+        return pd.DataFrame(lignes)
+
+
+# --- EXPÉRIENCES DE CLASSE ---
+def exporter_classe(depot, code, cle, destination=None, compresser=False):
+    """Enregistre l'expérience ``code`` (population cachée comprise) et toutes les soumissions (M, n, m).
+
+    ``cle`` : clé enseignant de l'expérience, sans laquelle l'archive révélerait N aux élèves.
+    """
+    experience = depot.experience_enseignant(code, cle)
+    if experience is None:
+        raise ValueError(f"aucune expérience de code {code!r} n'a cette clé enseignant")
+    soumissions = depot.soumissions(experience.code)
+    colonnes = {nom: compacter(soumissions[:, j]) for j, nom in enumerate(('id', 'M', 'n', 'm'))}
+    return ecrire_archive(destination, colonnes, {'type': "classe", **asdict(experience)}, compresser)
@@ -0,0 +1,97 @@
+"""Balayage hors interface d'une grille (N, M, n) réparti sur plusieurs processus.
+
+Chaque point de la grille est découpé en lots d'essais ; chaque lot reçoit son
+propre sous-flux aléatoire (``sous_flux``), si bien que le résultat ne dépend
+que de la graine, pas du nombre de processus.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cmr.aleatoire import sous_flux
+from cmr.estimateurs import intervalle_chapman, lincoln_petersen
+from cmr.population import Population
+
+TAILLE_LOT = 20_000
+
+
+def grille(N, M, n):
+    """Produit cartésien des valeurs de N, M et n, limité aux triplets réalisables (M, n ≤ N)."""
+    return [(N_, M_, n_) for N_, M_, n_ in itertools.product(N, M, n) if M_ <= N_ and n_ <= N_]
+
+
+def tirer_m(N, M, n, essais, rng, fidele=False):
+    """Nombre de marqués recapturés pour ``essais`` répétitions du protocole du Module 1.
+
+    Avec ``fidele=True`` chaque essai rejoue réellement le protocole (générer N
+    poissons, en marquer M, en recapturer n) ; sinon m est tiré directement
+    dans la loi hypergéométrique, qui est exactement sa loi.
+    """
+    if not fidele:
+        return rng.hypergeometric(M, N - M, n, size=essais)
+    m = np.empty(essais, dtype=np.int64)
+    for i in range(essais):
+        population = Population(N, rng)
+        population.marquer(population.tirer_non_marques(M, rng))
+        m[i] = population.est_marque(population.tirer(n, rng)).sum()
+    return m
+
+
+def _lot(N, M, n, essais, rng, fidele):
+    m = tirer_m(N, M, n, essais, rng, fidele)
+    valides = m > 0
+    erreur = (lincoln_petersen(M, n, m[valides]) - N) / N
+    basse, haute = intervalle_chapman(M, n, m)
+    return {
+        'essais': essais,
+        'm_nul': int(essais - valides.sum()),
+        'somme_erreur': float(erreur.sum()),
+        'somme_erreur_abs': float(np.abs(erreur).sum()),
+        'couverts': int(((basse <= N) & (N <= haute)).sum()),
+    }
+
+
+def balayer(points, essais=10_000, graine=0, processus=None, fidele=False, taille_lot=TAILLE_LOT):
+    """Simule ``essais`` recaptures pour chaque triplet (N, M, n) de ``points``.
+
+    Renvoie un DataFrame avec, par triplet : P(m = 0), le biais relatif et
+    l'erreur relative absolue moyenne de Lincoln-Petersen (sur les essais où
+    m > 0), et le taux de couverture de l'intervalle à 95 % de Chapman.
+    """
+    decoupage = []
+    for point in points:
+        tailles = [taille_lot] * (essais // taille_lot) + ([essais % taille_lot] if essais % taille_lot else [])
+        decoupage.extend((point, taille) for taille in tailles)
+    # Le flux du i-ème lot ne dépend que de (graine, i)
+    taches = [(point, taille, rng) for (point, taille), rng in zip(decoupage, sous_flux(graine, len(decoupage)))]
+
+    processus = os.cpu_count() if processus is None else processus
+    if processus <= 1:
+        lots = [_lot(*point, taille, rng, fidele) for point, taille, rng in taches]
+    else:
+        with ProcessPoolExecutor(max_workers=processus) as executeur:
+            futurs = [executeur.submit(_lot, *point, taille, rng, fidele) for point, taille, rng in taches]
+            lots = [futur.result() for futur in futurs]
+
+    cumuls = {}
+    for (point, _, _), lot in zip(taches, lots):
+        cumul = cumuls.setdefault(point, dict.fromkeys(lot, 0))
+        for cle, valeur in lot.items():
+            cumul[cle] += valeur
+
+    lignes = []
+    for (N, M, n), cumul in cumuls.items():
+        valides = cumul['essais'] - cumul['m_nul']
+        lignes.append({
+            'N': N, 'M': M, 'n': n,
+            'essais': cumul['essais'],
+            'p_m_nul': cumul['m_nul'] / cumul['essais'],
+            'biais_relatif': cumul['somme_erreur'] / valides if valides else np.nan,
+            'erreur_relative': cumul['somme_erreur_abs'] / valides if valides else np.nan,
+            'couverture_95': cumul['couverts'] / cumul['essais'],
+        })
+    return pd.DataFrame(lignes)
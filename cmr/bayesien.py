@@ -0,0 +1,170 @@
+"""Loi a posteriori de N sachant les captures, sur une grille de valeurs entières.
+
+L'a priori est uniforme sur [N_min, N_max] (l'intervalle annoncé du Module 2).
+Chaque occasion tirée au hasard dans toute la population apporte une
+vraisemblance hypergéométrique : parmi ses C_t poissons, R_t étaient déjà
+marqués, sur M_t marqués au total. À un terme constant près,
+
+    log P(R_t | N) = log (N - M_t)! - log (N - M_t - C_t + R_t)! - log N! + log (N - C_t)!
+
+La grille étant un intervalle d'entiers, chaque terme est une tranche
+contiguë d'une même plage de log-factorielles, calculée une fois par
+occasion : le reste coûte quatre additions en place sur la grille, sans
+indexation. La
+loi est tenue à jour occasion par occasion (``mettre_a_jour`` ne lit que les
+occasions nouvelles) ; normalisation et intervalle de crédibilité ne sont
+recalculés qu'à la demande, sur la seule plage où la loi n'est pas négligeable.
+"""
+
+import numpy as np
+
+from cmr.statistiques import log_factorielles
+
+# Points de la courbe affichée (la grille peut compter jusqu'à des millions de valeurs)
+POINTS_COURBE = 400
+# Masse laissée hors de la courbe de chaque côté
+QUEUE_COURBE = 0.0005
+# Écart de log-densité au maximum au-delà duquel une valeur de N est négligée dans les résumés
+ECART_LOG = 40
+
+
+class LoiAPosteriori:
+    """Densité a posteriori de N sur la grille N_min..N_max, en log et à une constante près."""
+
+    __slots__ = ("N_min", "N_max", "log_densite", "occasions", "borne", "_debut", "_probabilites", "_repartition")
+
+    def __init__(self, N_min, N_max):
+        if not 1 <= N_min <= N_max:
+            raise ValueError("il faut 1 ≤ N_min ≤ N_max")
+        self.N_min = int(N_min)
+        self.N_max = int(N_max)
+        self.log_densite = np.zeros(self.N_max - self.N_min + 1)
+        # Occasions de l'historique déjà intégrées, et plus petit N compatible avec les captures
+        self.occasions = 0
+        self.borne = self.N_min
+        self._debut = 0
+        self._probabilites = self._repartition = None
+
+    @property
+    def valeurs(self):
+        return np.arange(self.N_min, self.N_max + 1)
+
+    @property
+    def compatible(self):
+        """Faux si les captures excluent tout l'intervalle (plus de poissons distincts vus que N_max)."""
+        return self.borne <= self.N_max
+
+    @property
+    def nbytes(self):
+        if self._probabilites is None:
+            return self.log_densite.nbytes
+        return self.log_densite.nbytes + self._probabilites.nbytes + self._repartition.nbytes
+
+    def _tronquer(self, borne):
+        """Exclut les N < ``borne`` ; renvoie la position du premier N restant sur la grille."""
+        if borne > self.borne:
+            self.log_densite[self.borne - self.N_min:min(borne, self.N_max + 1) - self.N_min] = -np.inf
+            self.borne = borne
+        return min(self.borne, self.N_max + 1) - self.N_min
+
+    def ajouter_occasion(self, C, R, M):
+        """Multiplie la loi par la vraisemblance d'une occasion aléatoire (C pris, dont R marqués, sur M)."""
+        C, R, M = int(C), int(R), int(M)
+        debut = self._tronquer(M + C - R)
+        self._probabilites = None
+        N0, fin = self.N_min + debut, self.N_max + 1
+        if N0 >= fin:
+            return
+        # Les quatre tranches tiennent dans log(k!) pour k = N0 - M - C + R .. fin - 1
+        base = N0 - M - C + R
+        t = log_factorielles(base, fin)
+        log_densite = self.log_densite[debut:]
+        log_densite += t[N0 - M - base:fin - M - base]
+        log_densite -= t[:fin - base - M - C + R]
+        log_densite -= t[N0 - base:]
+        log_densite += t[N0 - C - base:fin - C - base]
+
+    def mettre_a_jour(self, historiques):
+        """Intègre les occasions de ``historiques`` arrivées depuis le dernier appel ; renvoie leur nombre.
+
+        Les occasions non aléatoires (marquage parmi les non marqués) n'apportent
+        pas de vraisemblance, seulement la borne N ≥ nombre de poissons distincts vus.
+        """
+        nouvelles = historiques.K - self.occasions
+        if nouvelles <= 0:
+            return 0
+        C, R, M = historiques.par_occasion()
+        for t in range(self.occasions, historiques.K):
+            if historiques.aleatoires >> t & 1:
+                self.ajouter_occasion(C[t], R[t], M[t])
+        self._tronquer(len(historiques.ids))
+        self._probabilites = None
+        self.occasions = historiques.K
+        return nouvelles
+
+    # --- RÉSUMÉS ---
+    def _support(self):
+        """(premier indice, probabilités, cumul) sur la plage où la loi n'est pas négligeable (mémoïsé).
+
+        La vraisemblance est unimodale en N : hors de la plage où la densité
+        dépasse e^-ECART_LOG fois son maximum, la masse est sous la précision
+        des flottants. Normalisation et cumul n'y sont pas calculés.
+        """
+        if self._probabilites is None:
+            if not self.compatible:
+                raise ValueError("les captures excluent tout l'intervalle de N")
+            log_densite = self.log_densite
+            retenus = log_densite >= log_densite.max() - ECART_LOG
+            debut = int(np.argmax(retenus))
+            fin = len(retenus) - int(np.argmax(retenus[::-1]))
+            p = log_densite[debut:fin] - log_densite[debut:fin].max()
+            np.exp(p, out=p)
+            p /= p.sum()
+            repartition = np.cumsum(p)
+            p.flags.writeable = repartition.flags.writeable = False
+            self._debut, self._probabilites, self._repartition = debut, p, repartition
+        return self._debut, self._probabilites, self._repartition
+
+    def probabilites(self):
+        """Probabilités a posteriori normalisées sur toute la grille."""
+        debut, p, _ = self._support()
+        complet = np.zeros(len(self.log_densite))
+        complet[debut:debut + len(p)] = p
+        return complet
+
+    def quantile(self, q):
+        """Plus petit N dont la probabilité cumulée atteint ``q``."""
+        debut, _, repartition = self._support()
+        return self.N_min + debut + min(int(np.searchsorted(repartition, q)), len(repartition) - 1)
+
+    def intervalle(self, niveau=0.95):
+        """Intervalle de crédibilité à queues égales (bornes comprises)."""
+        queue = (1 - niveau) / 2
+        return self.quantile(queue), self.quantile(1 - queue)
+
+    def mode(self):
+        return self.N_min + int(np.argmax(self.log_densite))
+
+    def moyenne(self):
+        debut, p, _ = self._support()
+        return self.N_min + debut + float(np.dot(p, np.arange(len(p), dtype=np.float64)))
+
+    def courbe(self, niveau=0.95, points=POINTS_COURBE):
+        """Colonnes (``N``, ``densite``, ``dedans``) pour le graphique, au plus ``points`` points.
+
+        La courbe couvre la plage [quantile 0,05 % ; quantile 99,95 %] (toute la
+        grille tant qu'elle est plate). Sur une grande plage, chaque point est
+        la probabilité moyenne d'un bloc de valeurs voisines : l'aire sous la
+        courbe reste celle de la loi.
+        """
+        debut, p, _ = self._support()
+        gauche = self.quantile(QUEUE_COURBE) - self.N_min - debut
+        droite = self.quantile(1 - QUEUE_COURBE) - self.N_min - debut + 1
+        p = p[gauche:droite]
+        pas = max(1, -(-len(p) // points))
+        debuts = np.arange(0, len(p), pas)
+        fins = np.minimum(debuts + pas, len(p))
+        densite = np.add.reduceat(p, debuts) / (fins - debuts)
+        N = self.N_min + debut + gauche + (debuts + fins - 1) / 2
+        bas, haut = self.intervalle(niveau)
+        return {'N': N, 'densite': densite, 'dedans': (N >= bas) & (N <= haut)}
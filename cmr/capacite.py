@@ -0,0 +1,112 @@
+"""Contrôle de capacité du serveur : mémoire par séance et mise en sommeil des séances inactives.
+
+Un seul processus Streamlit sert toute la classe. Chaque séance (``Simulation``)
+garde en mémoire des tableaux de taille N ; pour tenir 200 élèves et plus sur
+une instance de 2 Go, le gestionnaire endort les séances inactives (réduites à
+leur graine et aux indices des poissons marqués, les positions des poissons
+déplacés étant rangées sur disque) et, si le plafond global est dépassé, les
+séances les moins récemment utilisées.
+
+    gestionnaire = GestionnaireCapacite()
+    gestionnaire.toucher(cle_session, sim)   # au début de chaque passage
+    gestionnaire.equilibrer()
+
+Réglages par variables d'environnement :
+
+- ``CMR_MEMOIRE_MAX_MO`` : plafond global en Mo (1024 par défaut) ;
+- ``CMR_INACTIVITE_S`` : durée d'inactivité avant mise en sommeil (900 s par défaut) ;
+- ``CMR_DOSSIER_SOMMEIL`` : dossier des positions rangées sur disque (dossier temporaire du système par défaut).
+"""
+
+import os
+import threading
+import time
+import weakref
+
+MEMOIRE_MAX_MO = float(os.environ.get("CMR_MEMOIRE_MAX_MO", 1024))
+INACTIVITE_S = float(os.environ.get("CMR_INACTIVITE_S", 900))
+DOSSIER_SOMMEIL = os.environ.get("CMR_DOSSIER_SOMMEIL") or None
+
+# Une séance touchée depuis moins longtemps peut être en pleine action : on ne l'endort jamais
+GARDE_S = 30
+
+
+class GestionnaireCapacite:
+    """Registre des séances du processus, avec leur dernière activité.
+
+    Les séances sont référencées faiblement : une session Streamlit fermée
+    disparaît du registre sans intervention.
+    """
+
+    def __init__(self, memoire_max_mo=MEMOIRE_MAX_MO, inactivite_s=INACTIVITE_S, garde_s=GARDE_S, dossier=DOSSIER_SOMMEIL):
+        self.memoire_max = int(memoire_max_mo * 2**20)
+        self.inactivite = inactivite_s
+        self.garde = garde_s
+        self.dossier = dossier
+        self._seances = weakref.WeakValueDictionary()
+        self._activite = {}
+        self._verrou = threading.Lock()
+        self.endormies = 0
+        # Mises en sommeil qui n'ont rien libéré (séance déjà réduite à l'essentiel)
+        self.sans_effet = 0
+
+    def toucher(self, cle, simulation, maintenant=None):
+        """Note l'activité de la séance ``cle`` (à appeler à chaque passage du script)."""
+        with self._verrou:
+            self._seances[cle] = simulation
+            self._activite[cle] = time.monotonic() if maintenant is None else maintenant
+
+    def _vivantes(self):
+        """Couples (clé, séance, dernière activité), du moins au plus récemment utilisé."""
+        vivantes = []
+        for cle, activite in list(self._activite.items()):
+            simulation = self._seances.get(cle)
+            if simulation is None:
+                del self._activite[cle]
+            else:
+                vivantes.append((cle, simulation, activite))
+        vivantes.sort(key=lambda seance: seance[2])
+        return vivantes
+
+    def memoire(self):
+        """Mémoire totale occupée par les séances enregistrées (octets)."""
+        with self._verrou:
+            return sum(simulation.nbytes for _, simulation, _ in self._vivantes())
+
+    def equilibrer(self, maintenant=None):
+        """Endort les séances inactives, puis les plus anciennes tant que le plafond est dépassé.
+
+        Renvoie le nombre de séances endormies lors de cet appel ; celles dont
+        le sommeil n'a rien libéré sont comptées dans ``sans_effet``.
+        """
+        maintenant = time.monotonic() if maintenant is None else maintenant
+        endormies = sans_effet = 0
+        with self._verrou:
+            vivantes = self._vivantes()
+            total = sum(simulation.nbytes for _, simulation, _ in vivantes)
+            for _, simulation, activite in vivantes:
+                inactivite = maintenant - activite
+                if inactivite < self.garde:
+                    break
+                if simulation.endormie:
+                    continue
+                if inactivite >= self.inactivite or total > self.memoire_max:
+                    liberes = simulation.endormir(self.dossier)
+                    total -= liberes
+                    endormies += 1
+                    sans_effet += liberes <= 0
+        self.endormies += endormies
+        self.sans_effet += sans_effet
+        return endormies
+
+    def etat(self):
+        """Résumé pour le panneau d'instrumentation."""
+        with self._verrou:
+            vivantes = self._vivantes()
+            return {
+                'seances': len(vivantes),
+                'endormies': sum(simulation.endormie for _, simulation, _ in vivantes),
+                'memoire': sum(simulation.nbytes for _, simulation, _ in vivantes),
+                'memoire_max': self.memoire_max,
+                'sans_effet': self.sans_effet,
+            }
@@ -0,0 +1,215 @@
+"""Expérience de classe : une population cachée commune et les résultats de tous les élèves.
+
+L'enseignant crée une expérience : un code court, donné aux élèves, et une
+clé qu'il garde pour lui. Le code suffit pour rejoindre l'expérience et y
+envoyer ses résultats ; suivre le tableau de bord, révéler N ou exporter
+l'expérience demande la clé. Chaque élève qui la rejoint travaille sur la
+même population, reconstruite à partir de (N, graine)
+comme toute population paresseuse, avec son propre générateur pour les
+captures. Les résultats (M, n, m) sont écrits dans une base SQLite partagée
+par tout le serveur, et le tableau de bord les agrège au fil de l'eau :
+
+    depot = DepotClasse()
+    code, cle = depot.creer_experience(rng)
+    depot.soumettre(code, eleve, M, n, m)
+    agregat = Agregat(depot.experience_enseignant(code, cle))
+    agregat.rattraper(depot)          # ne lit que les nouvelles soumissions
+
+Emplacement de la base : variable d'environnement ``CMR_CLASSE_DB``
+(``cmr_classe.sqlite`` dans le répertoire courant par défaut).
+"""
+
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from cmr.statistiques import fusionner_moments
+
+CHEMIN_BASE = os.environ.get("CMR_CLASSE_DB", "cmr_classe.sqlite")
+
+# Sans lettres ni chiffres ambigus (O/0, I/1) : le code est recopié au tableau
+ALPHABET_CODE = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+LONGUEUR_CODE = 5
+
+# Nombre de classes de l'histogramme des estimations
+CLASSES = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiences (
+    code TEXT PRIMARY KEY,
+    N INTEGER NOT NULL,
+    graine INTEGER NOT NULL,
+    minimum INTEGER NOT NULL,
+    maximum INTEGER NOT NULL,
+    creee REAL NOT NULL,
+    cle TEXT
+);
+-- M, n et m : SQLite ne distingue pas la casse des noms de colonnes
+CREATE TABLE IF NOT EXISTS soumissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code TEXT NOT NULL,
+    eleve TEXT NOT NULL,
+    marques INTEGER NOT NULL,
+    recaptures INTEGER NOT NULL,
+    recaptures_marquees INTEGER NOT NULL,
+    horodatage REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS soumissions_code_id ON soumissions (code, id);
+"""
+
+
+@dataclass(frozen=True)
+class Experience:
+    code: str
+    N: int
+    graine: int
+    minimum: int
+    maximum: int
+
+
+class DepotClasse:
+    """Base SQLite des expériences de classe, partagée par toutes les sessions du serveur.
+
+    Une connexion par thread (Streamlit exécute chaque session dans son
+    thread) ; le journal WAL laisse le tableau de bord lire pendant que les
+    élèves écrivent.
+    """
+
+    def __init__(self, chemin=CHEMIN_BASE):
+        self.chemin = chemin
+        self._locales = threading.local()
+        with self._connexion() as connexion:
+            connexion.executescript(_SCHEMA)
+            # Base créée avant les clés enseignant : ses expériences ne peuvent plus être suivies
+            if "cle" not in {colonne[1] for colonne in connexion.execute("PRAGMA table_info(experiences)")}:
+                connexion.execute("ALTER TABLE experiences ADD COLUMN cle TEXT")
+
+    def _connexion(self):
+        connexion = getattr(self._locales, "connexion", None)
+        if connexion is None:
+            connexion = sqlite3.connect(self.chemin, timeout=10)
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("PRAGMA synchronous=NORMAL")
+            self._locales.connexion = connexion
+        return connexion
+
+    def creer_experience(self, rng, minimum=500, maximum=3000):
+        """Tire une population cachée commune ; renvoie ``(code, cle)``.
+
+        Le code est à donner aux élèves, la clé reste à l'enseignant. Elle est
+        tirée de l'entropie du système et non de ``rng`` : la graine d'une
+        séance est affichée, un élève pourrait rejouer ses tirages.
+        """
+        N = int(rng.integers(minimum, maximum, endpoint=True))
+        graine = int(rng.integers(2**63))
+        cle = secrets.token_urlsafe(12)
+        with self._connexion() as connexion:
+            while True:
+                code = "".join(rng.choice(list(ALPHABET_CODE), LONGUEUR_CODE))
+                try:
+                    connexion.execute(
+                        "INSERT INTO experiences VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (code, N, graine, minimum, maximum, time.time(), cle),
+                    )
+                    return code, cle
+                except sqlite3.IntegrityError:
+                    continue
+
+    def experience(self, code):
+        """L'expérience de code ``code`` (casse indifférente), ou None si elle n'existe pas."""
+        ligne = self._connexion().execute(
+            "SELECT code, N, graine, minimum, maximum FROM experiences WHERE code = ?",
+            (code.strip().upper(),),
+        ).fetchone()
+        return None if ligne is None else Experience(*ligne)
+
+    def experience_enseignant(self, code, cle):
+        """L'expérience de code ``code`` si ``cle`` est sa clé enseignant, sinon None."""
+        ligne = self._connexion().execute(
+            "SELECT cle FROM experiences WHERE code = ?", (code.strip().upper(),),
+        ).fetchone()
+        if ligne is None or ligne[0] is None or not hmac.compare_digest(ligne[0], cle.strip()):
+            return None
+        return self.experience(code)
+
+    def soumettre(self, code, eleve, M, n, m):
+        with self._connexion() as connexion:
+            connexion.execute(
+                "INSERT INTO soumissions (code, eleve, marques, recaptures, recaptures_marquees, horodatage) VALUES (?, ?, ?, ?, ?, ?)",
+                (code, eleve, int(M), int(n), int(m), time.time()),
+            )
+
+    def soumissions(self, code, apres=0):
+        """Tableau (id, M, n, m) des soumissions de ``code`` d'identifiant > ``apres``, dans l'ordre."""
+        lignes = self._connexion().execute(
+            "SELECT id, marques, recaptures, recaptures_marquees FROM soumissions WHERE code = ? AND id > ? ORDER BY id",
+            (code, apres),
+        ).fetchall()
+        return np.array(lignes, dtype=np.int64).reshape(-1, 4)
+
+
+class Agregat:
+    """Résumé incrémental des soumissions d'une expérience.
+
+    Chaque mise à jour ne lit que les lignes postérieures à la dernière vue
+    et fusionne le lot dans les compteurs (moyenne et variance par la formule
+    de Chan et al.) : le coût d'un rafraîchissement ne dépend pas du nombre
+    de soumissions déjà reçues.
+    """
+
+    def __init__(self, experience, classes=CLASSES):
+        self.experience = experience
+        self.dernier_id = 0
+        self.soumissions = 0
+        self.sans_recapture = 0
+        self.estimations = 0
+        self.moyenne = 0.0
+        self._m2 = 0.0
+        self.somme_Mn = 0
+        self.somme_m = 0
+        self.bords = np.linspace(0, 2 * experience.maximum, classes + 1)
+        self.comptes = np.zeros(classes, dtype=np.int64)
+        self._verrou = threading.Lock()
+
+    def rattraper(self, depot):
+        """Intègre les soumissions arrivées depuis le dernier appel ; renvoie leur nombre."""
+        with self._verrou:
+            lot = depot.soumissions(self.experience.code, self.dernier_id)
+            if len(lot):
+                self.ajouter(lot[:, 1], lot[:, 2], lot[:, 3])
+                self.dernier_id = int(lot[-1, 0])
+            return len(lot)
+
+    def ajouter(self, M, n, m):
+        M, n, m = (np.asarray(v, dtype=np.int64) for v in (M, n, m))
+        self.soumissions += len(m)
+        self.somme_Mn += int((M * n).sum())
+        self.somme_m += int(m.sum())
+        avec = m > 0
+        self.sans_recapture += int(np.count_nonzero(~avec))
+        estimations = M[avec] * n[avec] / m[avec]
+        if len(estimations) == 0:
+            return
+        self.estimations, self.moyenne, self._m2 = fusionner_moments((self.estimations, self.moyenne, self._m2), estimations)
+        # Les estimations au-delà du dernier bord tombent dans la dernière classe
+        classes = np.searchsorted(self.bords, estimations, side="right") - 1
+        np.add.at(self.comptes, np.minimum(classes, len(self.comptes) - 1), 1)
+
+    @property
+    def ecart_type(self):
+        return float(np.sqrt(self._m2 / (self.estimations - 1))) if self.estimations > 1 else np.nan
+
+    @property
+    def estimation_commune(self):
+        """Estimateur poolé : Σ M·n / Σ m sur toutes les soumissions, y compris celles où m = 0."""
+        return self.somme_Mn / self.somme_m if self.somme_m else np.nan
+
+    def histogramme(self):
+        """Effectifs et bornes des classes des estimations individuelles (comme ``ResultatMonteCarlo``)."""
+        return self.comptes.copy(), self.bords
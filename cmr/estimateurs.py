@@ -0,0 +1,32 @@
+"""Estimateurs de N pour une capture-recapture en deux temps (vectorisés sur m)."""
+
+import numpy as np
+
+# Quantile de la loi normale pour un intervalle de confiance à 95 %
+Z_95 = 1.959963984540054
+
+
+def lincoln_petersen(M, n, m):
+    """N = M × n / m ; NaN quand m = 0."""
+    m = np.asarray(m, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(m > 0, M * n / m, np.nan)
+
+
+def chapman(M, n, m):
+    """Estimateur de Chapman, quasi sans biais et défini même si m = 0."""
+    m = np.asarray(m, dtype=np.float64)
+    return (M + 1.0) * (n + 1.0) / (m + 1.0) - 1.0
+
+
+def variance_chapman(M, n, m):
+    """Variance estimée de l'estimateur de Chapman (Seber, 1970)."""
+    m = np.asarray(m, dtype=np.float64)
+    return (M + 1.0) * (n + 1.0) * (M - m) * (n - m) / ((m + 1.0) ** 2 * (m + 2.0))
+
+
+def intervalle_chapman(M, n, m, z=Z_95):
+    """Intervalle de confiance normal (bornes basse, haute) autour de l'estimateur de Chapman."""
+    centre = chapman(M, n, m)
+    demi_largeur = z * np.sqrt(variance_chapman(M, n, m))
+    return centre - demi_largeur, centre + demi_largeur
@@ -0,0 +1,38 @@
+"""État versionné de la simulation et vues dérivées mémoïsées sur la version."""
+
+import time
+
+
+class VuesDerivees:
+    """Compteur de version + cache des vues calculées à partir de l'état.
+
+    Toute action qui modifie la simulation (génération, marquage, recapture)
+    appelle ``incrementer``. Une vue n'est recalculée que si la version a
+    changé depuis son dernier calcul : une interaction qui ne touche pas à
+    la simulation (case à cocher, curseur...) ne coûte rien en O(N).
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._cache = {}
+        self.recalculees = {}
+
+    def incrementer(self):
+        self.version += 1
+
+    def nouveau_passage(self):
+        """À appeler au début de chaque exécution du script pour remettre à zéro le relevé."""
+        self.recalculees = {}
+
+    def obtenir(self, nom, fabrique):
+        """Valeur de la vue ``nom``, recalculée par ``fabrique()`` si l'état a changé."""
+        version, valeur = self._cache.get(nom, (None, None))
+        if version != self.version:
+            debut = time.perf_counter()
+            valeur = fabrique()
+            self.recalculees[nom] = time.perf_counter() - debut
+            self._cache[nom] = (self.version, valeur)
+        return valeur
+
+    def oublier(self):
+        self._cache.clear()
@@ -0,0 +1,71 @@
+"""Spécifications Vega-Lite des graphiques de l'application, construites une fois pour toutes.
+
+``st.scatter_chart`` et ``st.bar_chart`` reconstruisent à chaque passage un
+graphique Altair (import d'Altair au premier appel, puis génération et
+validation de la spécification) : environ 20 ms par graphique. Ces
+spécifications statiques, passées à ``st.vega_lite_chart``, ne laissent que
+la sérialisation des données.
+"""
+
+from functools import lru_cache
+
+STATUTS = ["Marqué", "Non marqué"]
+COULEURS = ["#e4572e", "#4c78a8"]
+
+
+@lru_cache(maxsize=None)
+def nuage(taille_points):
+    """Nuage (x, y) du lagon coloré par ``Statut``, axes fixés sur [0, 1]."""
+    axe = {"type": "quantitative", "scale": {"domain": [0, 1]}}
+    return {
+        "mark": {"type": "circle", "size": taille_points, "opacity": 0.8},
+        "encoding": {
+            "x": {"field": "x", **axe},
+            "y": {"field": "y", **axe},
+            "color": {"field": "Statut", "type": "nominal", "scale": {"domain": STATUTS, "range": COULEURS}},
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def histogramme(titre_x, titre_y):
+    """Histogramme déjà calculé : colonnes ``debut`` et ``fin`` des classes, ``effectif``."""
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "debut", "type": "quantitative", "bin": {"binned": True}, "title": titre_x},
+            "x2": {"field": "fin"},
+            "y": {"field": "effectif", "type": "quantitative", "title": titre_y},
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def courbe(titre_x, titre_y):
+    """Courbe reliant les points (``x``, ``y``) dans l'ordre des x."""
+    return {
+        "mark": {"type": "line", "point": True},
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": titre_x},
+            "y": {"field": "y", "type": "quantitative", "title": titre_y},
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def densite(titre_x, titre_y):
+    """Densité (``N``, ``densite``) dont la partie où ``dedans`` est vrai (l'intervalle) est mise en valeur."""
+    encodage = {
+        "x": {"field": "N", "type": "quantitative", "title": titre_x},
+        "y": {"field": "densite", "type": "quantitative", "title": titre_y},
+    }
+    return {
+        "layer": [
+            {"mark": {"type": "area", "color": COULEURS[1], "opacity": 0.3}, "encoding": encodage},
+            {
+                "transform": [{"filter": {"field": "dedans", "equal": True}}],
+                "mark": {"type": "area", "color": COULEURS[1], "opacity": 0.8},
+                "encoding": encodage,
+            },
+        ],
+    }
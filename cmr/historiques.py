@@ -0,0 +1,166 @@
+"""Historiques de capture sur plusieurs occasions, codés en masques de bits uint64.
+
+Seuls les poissons capturés au moins une fois ont une entrée : ``ids`` (trié)
+et ``masques`` (bit t à 1 si le poisson a été pris à l'occasion t). La mémoire
+est donc en O(nombre de poissons capturés), pas en O(N).
+
+Un identifiant négatif désigne un historique « détaché » : poisson mort ou
+émigré, ou poisson qui a perdu sa marque et que l'observateur ne peut plus
+reconnaître. Son passé reste compté dans les occasions déjà réalisées.
+"""
+
+import numpy as np
+
+OCCASIONS_MAX = 64
+
+_POPCOUNT = getattr(np, "bitwise_count", None)
+
+
+def uniques_tries(valeurs):
+    """Valeurs distinctes triées (plus rapide que ``np.unique`` sur des entiers déjà presque uniques)."""
+    valeurs = np.sort(valeurs)
+    if len(valeurs) == 0:
+        return valeurs
+    return valeurs[np.concatenate(([True], valeurs[1:] != valeurs[:-1]))]
+
+
+def popcount(masques):
+    """Nombre de bits à 1 de chaque masque uint64."""
+    if _POPCOUNT is not None:
+        return _POPCOUNT(masques)
+    octets = np.ascontiguousarray(masques, dtype=np.uint64).view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(octets, axis=1).sum(axis=1)
+
+
+def bit_de_poids_faible(masques):
+    """Indice du bit à 1 le plus bas de chaque masque (64 si le masque est nul)."""
+    isole = masques & (~masques + np.uint64(1))
+    return np.where(masques == 0, OCCASIONS_MAX, popcount(isole - np.uint64(1)))
+
+
+class Historiques:
+    """Historiques de capture de la population, une occasion = un bit."""
+
+    __slots__ = ("ids", "masques", "K", "marquantes", "aleatoires", "_par_occasion")
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.masques = np.empty(0, dtype=np.uint64)
+        self.K = 0
+        # Masques d'occasions : celles où les poissons pris sont marqués, et celles
+        # tirées au hasard dans toute la population (seules utilisables par Schnabel)
+        self.marquantes = 0
+        self.aleatoires = 0
+        self._par_occasion = None
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + self.masques.nbytes
+
+    def enregistrer(self, indices, marquante, aleatoire):
+        """Ajoute une occasion de capture des poissons ``indices`` et renvoie son numéro."""
+        if self.K >= OCCASIONS_MAX:
+            raise ValueError(f"Au plus {OCCASIONS_MAX} occasions de capture par population")
+        t = self.K
+        bit = np.uint64(1) << np.uint64(t)
+        indices = uniques_tries(np.asarray(indices, dtype=np.int64))
+        position = np.searchsorted(self.ids, indices)
+        connus = position < len(self.ids)
+        connus[connus] = self.ids[position[connus]] == indices[connus]
+        self.masques[position[connus]] |= bit
+        nouveaux = indices[~connus]
+        if len(nouveaux):
+            self.ids = np.insert(self.ids, position[~connus], nouveaux)
+            self.masques = np.insert(self.masques, position[~connus], bit)
+        self.marquantes |= int(marquante) << t
+        self.aleatoires |= int(aleatoire) << t
+        self.K += 1
+        self._par_occasion = None
+        return t
+
+    def detacher(self, indices):
+        """Détache les historiques des poissons ``indices`` (ils ne désignent plus aucun poisson vivant)."""
+        indices = uniques_tries(np.asarray(indices, dtype=np.int64))
+        position = np.searchsorted(self.ids, indices)
+        connus = position < len(self.ids)
+        connus[connus] = self.ids[position[connus]] == indices[connus]
+        self._detacher_positions(position[connus])
+
+    def _detacher_positions(self, positions):
+        if len(positions) == 0:
+            return
+        plus_petit = min(int(self.ids[0]), 0) if len(self.ids) else 0
+        detaches = self.masques[positions]
+        restants = np.ones(len(self.ids), dtype=bool)
+        restants[positions] = False
+        self.ids = np.concatenate((np.arange(plus_petit - len(positions), plus_petit), self.ids[restants]))
+        self.masques = np.concatenate((detaches, self.masques[restants]))
+
+    def renumeroter(self, garde, rang):
+        """Suit un compactage de la population : ``garde[i]`` indique si le poisson i reste.
+
+        Les poissons retirés sont détachés, les autres prennent leur nouveau
+        numéro ``rang[i]`` (table calculée une fois par l'appelant).
+        """
+        vivants = np.flatnonzero(self.ids >= 0)
+        ids = self.ids[vivants]
+        restent = garde[ids]
+        self._detacher_positions(vivants[~restent])
+        # Le détachement préserve l'ordre des historiques restants, rangés en fin de tableau
+        self.ids[len(self.ids) - np.count_nonzero(restent):] = rang[ids[restent]]
+
+    def _drapeaux(self, masque):
+        return ((np.uint64(masque) >> np.arange(self.K, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+
+    @property
+    def occasions_marquantes(self):
+        """Booléen par occasion : les poissons pris y ont été marqués."""
+        return self._drapeaux(self.marquantes)
+
+    @property
+    def occasions_aleatoires(self):
+        """Booléen par occasion : échantillon tiré au hasard dans toute la population."""
+        return self._drapeaux(self.aleatoires)
+
+    def par_occasion(self):
+        """Tableaux (C_t, R_t, M_t) sur les K occasions.
+
+        C_t : poissons pris à l'occasion t ; R_t : parmi eux, ceux déjà marqués ;
+        M_t : poissons marqués dans la population juste avant l'occasion t.
+        """
+        if self._par_occasion is None:
+            self._par_occasion = self._calculer_par_occasion()
+        return self._par_occasion
+
+    def _calculer_par_occasion(self):
+        premier_marquage = bit_de_poids_faible(self.masques & np.uint64(self.marquantes))
+        M = np.cumsum(np.bincount(premier_marquage, minlength=OCCASIONS_MAX + 1))[:self.K]
+        M = np.concatenate(([0], M[:-1])) if self.K else M
+        # Bits strictement postérieurs au premier marquage : ce sont les recaptures
+        jamais_marque = premier_marquage >= OCCASIONS_MAX
+        decalage = np.where(jamais_marque, 0, premier_marquage + 1).astype(np.uint64)
+        recaptures = np.where(jamais_marque, np.uint64(0), (self.masques >> decalage) << decalage)
+        C = np.empty(self.K, dtype=np.int64)
+        R = np.empty(self.K, dtype=np.int64)
+        for t in range(self.K):
+            bit = np.uint64(1) << np.uint64(t)
+            C[t] = np.count_nonzero(self.masques & bit)
+            R[t] = np.count_nonzero(recaptures & bit)
+        return C, R, M
+
+    def _sommes(self):
+        C, R, M = self.par_occasion()
+        aleatoire = self.occasions_aleatoires
+        return C[aleatoire].astype(np.float64), R[aleatoire].astype(np.float64), M[aleatoire].astype(np.float64)
+
+    def schnabel(self):
+        """Estimateur de Schnabel : N = Σ C_t M_t / Σ R_t (NaN si aucune recapture)."""
+        C, R, M = self._sommes()
+        return float(C @ M / R.sum()) if R.sum() > 0 else float("nan")
+
+    def schumacher_eschmeyer(self):
+        """Estimateur de Schumacher-Eschmeyer : N = Σ C_t M_t² / Σ R_t M_t."""
+        C, R, M = self._sommes()
+        denominateur = R @ M
+        return float(C @ M ** 2 / denominateur) if denominateur > 0 else float("nan")
+
@@ -0,0 +1,36 @@
+"""Mélange des poissons entre marquage et recapture : marche aléatoire vectorisée sur les coordonnées.
+
+À chaque pas, chaque poisson fait un petit déplacement aléatoire (incréments
+uniformes d'écart-type ``force``) et rebondit sur les bords du lagon. Tout se
+fait en place sur les tableaux float32, sans tableau temporaire de taille N
+autre que le tampon de bruit.
+"""
+
+import numpy as np
+
+# Un incrément uniforme sur [-a, a] a pour écart-type a / √3
+_DEMI_LARGEUR = np.float32(np.sqrt(3.0))
+
+
+def _rebondir(coordonnees):
+    # Réflexion sur 0 puis sur 1 : valable tant qu'un pas reste inférieur à la taille du lagon
+    np.abs(coordonnees, out=coordonnees)
+    np.subtract(1, coordonnees, out=coordonnees)
+    np.abs(coordonnees, out=coordonnees)
+    np.subtract(1, coordonnees, out=coordonnees)
+
+
+def etapes_melange(population, pas, force, rng):
+    """Générateur qui déplace toute la population d'un pas à chaque itération et renvoie le numéro du pas."""
+    bruit = np.empty(len(population), dtype=np.float32)
+    demi_largeur = np.float32(2 * force) * _DEMI_LARGEUR
+    for numero in range(1, pas + 1):
+        for coordonnees in (population.x, population.y):
+            rng.random(out=bruit, dtype=np.float32)
+            bruit -= np.float32(0.5)
+            bruit *= demi_largeur
+            coordonnees += bruit
+            _rebondir(coordonnees)
+        population.positions_modifiees()
+        yield numero
+
@@ -0,0 +1,56 @@
+"""Répétition vectorisée de la recapture : distribution de l'estimateur de Lincoln-Petersen."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ResultatMonteCarlo:
+    """Résumé de ``repetitions`` recaptures simulées pour un triplet (N, M, n)."""
+
+    N: int
+    M: int
+    n: int
+    m: np.ndarray
+    estimations: np.ndarray
+    p_m_nul: float
+    moyenne: float
+    biais: float
+    variance: float
+
+    @property
+    def ecart_type(self):
+        return float(np.sqrt(self.variance))
+
+    def histogramme(self, classes=40):
+        """Effectifs et bornes des classes des estimations (m = 0 exclus)."""
+        valides = self.estimations[np.isfinite(self.estimations)]
+        if len(valides) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.histogram(valides, bins=classes)
+
+
+def simuler_estimations(N, M, n, repetitions=10_000, rng=None):
+    """Tire ``repetitions`` valeurs de m ~ Hypergéométrique(N, M, n) en un seul appel.
+
+    Chaque tirage donne N_est = M × n / m ; les tirages avec m = 0 donnent NaN et
+    sont exclus de la moyenne et de la variance, mais comptés dans ``p_m_nul``.
+    """
+    if not (0 <= M <= N and 0 <= n <= N):
+        raise ValueError(f"il faut 0 ≤ M ≤ N et 0 ≤ n ≤ N (N = {N}, M = {M}, n = {n})")
+    rng = np.random.default_rng() if rng is None else rng
+    m = rng.hypergeometric(M, N - M, n, size=repetitions)
+    estimations = np.full(repetitions, np.nan)
+    valides = m > 0
+    estimations[valides] = M * n / m[valides]
+    if valides.any():
+        moyenne = float(estimations[valides].mean())
+        variance = float(estimations[valides].var())
+    else:
+        moyenne = variance = float("nan")
+    return ResultatMonteCarlo(
+        N=int(N), M=int(M), n=int(n), m=m, estimations=estimations,
+        p_m_nul=float(1.0 - valides.mean()), moyenne=moyenne,
+        biais=moyenne - N, variance=variance,
+    )
@@ -0,0 +1,201 @@
+"""Plan d'expérience optimal : le couple (M, n) le moins coûteux qui atteint une précision visée.
+
+Pour chaque M candidat, on cherche par dichotomie le plus petit n qui respecte
+les critères (coefficient de variation de l'estimateur de Chapman, P(m = 0)),
+pour tous les M à la fois : chaque étape évalue exactement la loi
+hypergéométrique de m sur un tableau (M × valeurs de N) × valeurs de m. La
+grille de M est d'abord grossière, puis raffinée autour du meilleur plan
+jusqu'à l'entier près.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from cmr.statistiques import fenetre_m, log_factorielle
+
+# Points de la grille de M à chaque niveau de raffinement
+POINTS_GRILLE = 32
+# Valeurs de N évaluées quand N n'est connu que par un intervalle (bornes comprises)
+POINTS_INTERVALLE = 3
+
+
+def criteres_chapman(N, M, n):
+    """P(m = 0) et coefficient de variation exact de l'estimateur de Chapman, vectorisés sur (N, M, n).
+
+    Le coefficient de variation est pris par rapport au vrai N et inclut le
+    biais : √E[(N̂ - N)²] / N. Sinon un plan minuscule (M = n = 1), dont
+    l'estimation ne varie presque pas mais vaut toujours 1 ou 3, serait jugé
+    parfaitement précis.
+
+    La loi de m n'est évaluée que sur une fenêtre de ±8 écarts-types autour
+    de sa moyenne (la masse en dehors est négligeable) : le coût ne dépend
+    pas de la taille de la population.
+    """
+    N, M, n = (np.ravel(v) for v in np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in (N, M, n))))
+    debut, fin = fenetre_m(N, M, n)
+    m = debut[:, None] + np.arange(int((fin - debut).max()) + 1)
+    hors_support = m > fin[:, None]
+    np.minimum(m, fin[:, None], out=m)
+    # Les termes constants de la loi (ne dépendant pas de m) disparaissent à la normalisation
+    log_p = log_factorielle(m)
+    log_p += log_factorielle(M[:, None] - m)
+    log_p += log_factorielle(n[:, None] - m)
+    log_p += log_factorielle((N - M - n)[:, None] + m)
+    np.negative(log_p, out=log_p)
+    log_p[hors_support] = -np.inf
+    log_p -= log_p.max(axis=1, keepdims=True)
+    p = np.exp(log_p, out=log_p)
+    p /= p.sum(axis=1, keepdims=True)
+    erreur = ((M + 1.0) * (n + 1.0))[:, None] / (m + 1.0)
+    erreur -= (N + 1.0)[:, None]
+    carre_moyen = np.einsum("ij,ij->i", p, erreur * erreur)
+    p_m_nul = np.where(debut == 0, p[:, 0], 0.0)
+    return p_m_nul, np.sqrt(carre_moyen) / N
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Plan retenu et ses performances, au pire sur les valeurs de N envisagées."""
+
+    M: int
+    n: int
+    cout: float
+    p_m_nul: float
+    cv: float
+    # Frontière de la grille grossière : plus petit n réalisable pour chaque M (en lecture seule)
+    frontiere_M: np.ndarray
+    frontiere_n: np.ndarray
+
+
+def _pires_criteres(valeurs_N, M, n):
+    """Critères au pire sur ``valeurs_N`` pour chaque couple (M, n)."""
+    p_m_nul, cv = criteres_chapman(valeurs_N[None, :], M[:, None], n[:, None])
+    return p_m_nul.reshape(len(M), -1).max(axis=1), cv.reshape(len(M), -1).max(axis=1)
+
+
+def _acceptables(valeurs_N, M, n, cv_max, p_m_nul_max):
+    p_m_nul, cv = _pires_criteres(valeurs_N, M, n)
+    acceptables = np.ones(len(M), dtype=bool)
+    if cv_max is not None:
+        acceptables &= cv <= cv_max
+    if p_m_nul_max is not None:
+        acceptables &= p_m_nul <= p_m_nul_max
+    return acceptables
+
+
+def _plus_petits_n(valeurs_N, M, plafond_n, cv_max, p_m_nul_max, n_bas=1, n_haut=None):
+    """Plus petit n acceptable pour chaque M (dichotomie simultanée) ; ``plafond_n + 1`` si aucun.
+
+    ``[n_bas, n_haut]`` encadre la réponse quand on la connaît déjà (``n_haut``
+    acceptable pour tous les M) ; sinon on vérifie d'abord le plafond.
+    """
+    bas = np.full(len(M), n_bas, dtype=np.int64)
+    if n_haut is None:
+        haut = np.full(len(M), plafond_n + 1, dtype=np.int64)
+        # Les critères s'améliorent quand n augmente : si le plafond ne suffit pas, rien ne suffira
+        possibles = _acceptables(valeurs_N, M, np.full(len(M), plafond_n), cv_max, p_m_nul_max)
+        haut[possibles] = plafond_n
+        bas[~possibles] = haut[~possibles]
+    else:
+        haut = np.full(len(M), n_haut, dtype=np.int64)
+    while True:
+        actifs = np.flatnonzero(bas < haut)
+        if len(actifs) == 0:
+            return haut
+        bas_actifs, haut_actifs = bas[actifs], haut[actifs]
+        # Coupure géométrique tant que l'intervalle est large : les grands n, dont la loi
+        # de m est la plus étalée (donc la plus chère à évaluer), sont rarement visités
+        milieu = np.where(
+            haut_actifs > 4 * bas_actifs,
+            np.sqrt(bas_actifs * haut_actifs).astype(np.int64),
+            (bas_actifs + haut_actifs) // 2,
+        )
+        ok = _acceptables(valeurs_N, M[actifs], milieu, cv_max, p_m_nul_max)
+        haut[actifs[ok]] = milieu[ok]
+        bas[actifs[~ok]] = milieu[~ok] + 1
+
+
+@lru_cache(maxsize=128)
+def plan_optimal(N_min, N_max=None, cv_max=None, p_m_nul_max=None, plafond_M=None, plafond_n=None, cout_M=1.0, cout_n=1.0):
+    """Couple (M, n) de coût ``cout_M × M + cout_n × n`` minimal qui respecte les critères.
+
+    ``N_max`` : N n'est connu que par l'intervalle [N_min, N_max] (Module 2) et
+    les critères doivent tenir pour toutes ses valeurs. ``cv_max`` borne le
+    coefficient de variation de l'estimateur de Chapman, ``p_m_nul_max`` la
+    probabilité de ne recapturer aucun marqué. Les plafonds de M et n valent
+    N_min par défaut. Renvoie None si aucun plan sous les plafonds ne convient.
+    """
+    if cv_max is None and p_m_nul_max is None:
+        raise ValueError("il faut au moins un critère : cv_max ou p_m_nul_max")
+    N_max = N_min if N_max is None else N_max
+    valeurs_N = np.unique(np.geomspace(N_min, N_max, POINTS_INTERVALLE).round().astype(np.int64))
+    plafond_M = N_min if plafond_M is None else min(plafond_M, N_min)
+    plafond_n = N_min if plafond_n is None else min(plafond_n, N_min)
+    if plafond_M < 1 or plafond_n < 1:
+        return None
+
+    bas, haut = 1, plafond_M
+    n_bas, n_haut = 1, None
+    frontiere = None
+    while True:
+        M = np.unique(np.linspace(bas, haut, POINTS_GRILLE).round().astype(np.int64))
+        n = _plus_petits_n(valeurs_N, M, plafond_n, cv_max, p_m_nul_max, n_bas, n_haut)
+        couts = np.where(n <= plafond_n, cout_M * M + cout_n * n, np.inf)
+        if frontiere is None:
+            if np.isinf(couts).all():
+                return None
+            frontiere = M[n <= plafond_n], n[n <= plafond_n]
+        meilleur = int(np.argmin(couts))
+        if len(M) == haut - bas + 1:
+            break
+        # Raffinement entre les voisins du meilleur point de la grille ; le n minimal
+        # décroît avec M, ce qui encadre aussi n pour la grille suivante
+        gauche, droite = max(meilleur - 1, 0), min(meilleur + 1, len(M) - 1)
+        bas, haut = int(M[gauche]), int(M[droite])
+        n_bas = int(n[droite])
+        n_haut = int(n[gauche]) if n[gauche] <= plafond_n else None
+
+    M_opt, n_opt = int(M[meilleur]), int(n[meilleur])
+    p_m_nul, cv = _pires_criteres(valeurs_N, np.array([M_opt]), np.array([n_opt]))
+    for tableau in frontiere:
+        tableau.flags.writeable = False
+    return Plan(
+        M=M_opt, n=n_opt, cout=float(couts[meilleur]), p_m_nul=float(p_m_nul[0]), cv=float(cv[0]),
+        frontiere_M=frontiere[0], frontiere_n=frontiere[1],
+    )
+
+
+@lru_cache(maxsize=128)
+def meilleure_precision(N_min, N_max=None, p_m_nul_max=None, plafond_M=None, plafond_n=None):
+    """Plan sous les plafonds dont le coefficient de variation au pire est le plus petit.
+
+    Ce que le budget permet au mieux quand ``plan_optimal`` ne trouve rien.
+    Seuls les plans qui respectent ``p_m_nul_max`` sont retenus ; s'il n'y en a
+    aucun, c'est le plan de plus petit P(m = 0). L'erreur de Chapman n'est pas
+    monotone en (M, n) quand m est souvent nul : on évalue une grille de
+    M × n plutôt que les seuls plafonds.
+    """
+    N_max = N_min if N_max is None else N_max
+    valeurs_N = np.unique(np.geomspace(N_min, N_max, POINTS_INTERVALLE).round().astype(np.int64))
+    plafond_M = N_min if plafond_M is None else min(plafond_M, N_min)
+    plafond_n = N_min if plafond_n is None else min(plafond_n, N_min)
+    M, n = np.meshgrid(
+        np.unique(np.linspace(1, plafond_M, POINTS_GRILLE).round().astype(np.int64)),
+        np.unique(np.linspace(1, plafond_n, POINTS_GRILLE).round().astype(np.int64)),
+    )
+    M, n = M.ravel(), n.ravel()
+    p_m_nul, cv = _pires_criteres(valeurs_N, M, n)
+    if p_m_nul_max is not None and (p_m_nul <= p_m_nul_max).any():
+        meilleur = int(np.argmin(np.where(p_m_nul <= p_m_nul_max, cv, np.inf)))
+    elif p_m_nul_max is not None:
+        meilleur = int(np.lexsort((cv, p_m_nul))[0])
+    else:
+        meilleur = int(np.argmin(cv))
+    vide = np.empty(0, dtype=np.int64)
+    vide.flags.writeable = False
+    return Plan(
+        M=int(M[meilleur]), n=int(n[meilleur]), cout=float(M[meilleur] + n[meilleur]),
+        p_m_nul=float(p_m_nul[meilleur]), cv=float(cv[meilleur]), frontiere_M=vide, frontiere_n=vide,
+    )
@@ -0,0 +1,300 @@
+"""Population compacte de poissons : une graine, les indices des marqués et les historiques de capture."""
+
+import tempfile
+
+import numpy as np
+
+from cmr.aleatoire import uniformes_indexees
+from cmr.historiques import Historiques, uniques_tries
+from cmr.spatial import GrilleSpatiale
+
+# Au-delà de cette fraction de candidats à tirer, le rejet devient coûteux :
+# on énumère alors explicitement les candidats (coût O(N), mais k est déjà O(N)).
+SEUIL_ENUMERATION = 0.5
+
+
+def tirer_sans_remise(rng, N, k, exclus=None):
+    """Tire k indices distincts dans [0, N) en O(k log k), sans tableau de taille N.
+
+    ``exclus`` est une fonction vectorisée qui renvoie True pour les indices
+    interdits (par exemple les poissons déjà marqués) ; l'appelant garantit
+    qu'il reste au moins k indices autorisés.
+    """
+    choisis = np.empty(0, dtype=np.int64)
+    while len(choisis) < k:
+        manque = k - len(choisis)
+        candidats = rng.integers(0, N, size=manque + manque // 8 + 16)
+        if exclus is not None:
+            candidats = candidats[~exclus(candidats)]
+        choisis = uniques_tries(np.concatenate((choisis, candidats)))
+    if len(choisis) > k:
+        choisis = choisis[rng.choice(len(choisis), k, replace=False)]
+    else:
+        rng.shuffle(choisis)
+    return choisis
+
+
+def octets_en_memoire(tableau):
+    """Octets de ``tableau`` en mémoire vive : zéro s'il est projeté depuis un fichier."""
+    base = tableau
+    while isinstance(base, np.ndarray):
+        if isinstance(base, np.memmap):
+            return 0
+        base = base.base
+    return tableau.nbytes
+
+
+def projeter_sur_disque(tableau, dossier=None):
+    """Copie ``tableau`` dans un fichier temporaire et le renvoie projeté en mémoire (modifiable).
+
+    Le fichier n'a pas de nom et disparaît avec la projection ; ses pages ne
+    reviennent en mémoire vive qu'une fois lues. Un tableau déjà projeté est
+    renvoyé tel quel.
+    """
+    if octets_en_memoire(tableau) == 0:
+        return tableau
+    with tempfile.TemporaryFile(dir=dossier) as fichier:
+        np.ascontiguousarray(tableau).tofile(fichier)
+        fichier.flush()
+        # np.asarray : un ndarray ordinaire, qui garde la projection vivante par sa base
+        return np.asarray(np.memmap(fichier, dtype=tableau.dtype, mode="r+", shape=tableau.shape))
+
+
+class Population:
+    """Population de N poissons décrite par une graine et l'ensemble des marqués.
+
+    Tant que personne ne les déplace, les coordonnées du lagon ne sont pas
+    stockées : celles du poisson i se recalculent à la demande à partir de
+    (graine, i) par un générateur à compteur (``uniformes_indexees``). Les
+    marques sont un tableau trié des indices marqués. L'état est donc en O(M)
+    et non en O(N) : N peut se compter en millions.
+
+    Les morts et les départs renumérotent les survivants : la population
+    reste paresseuse en gardant le numéro d'origine de chaque poisson
+    (``_origines``), d'où se déduit sa position.
+    """
+
+    __slots__ = ("N", "graine", "_x", "_y", "_origines", "_marques", "historiques", "_grille")
+
+    def __init__(self, N, rng=None, graine=None):
+        if graine is None:
+            rng = np.random.default_rng() if rng is None else rng
+            graine = int(rng.integers(2**63))
+        self.graine = int(graine)
+        self.N = int(N)
+        # Coordonnées explicites, seulement une fois les poissons déplacés (voir ``x``)
+        self._x = None
+        self._y = None
+        # Numéro d'origine (dans la graine) de chaque poisson, une fois la population renumérotée ;
+        # None tant que le poisson i est le i-ème de la graine
+        self._origines = None
+        self._marques = np.empty(0, dtype=np.int64)
+        self.historiques = Historiques()
+        self._grille = None
+
+    def __len__(self):
+        return self.N
+
+    @property
+    def M(self):
+        """Nombre de poissons portant réellement une marque."""
+        return len(self._marques)
+
+    @property
+    def marques(self):
+        """Indices triés des poissons marqués (en lecture seule)."""
+        vue = self._marques.view()
+        vue.flags.writeable = False
+        return vue
+
+    @property
+    def paresseuse(self):
+        """Vrai tant que les positions se déduisent de la graine (aucun tableau de coordonnées)."""
+        return self._x is None
+
+    @property
+    def nbytes(self):
+        taille = self._marques.nbytes + self.historiques.nbytes
+        if self._x is not None:
+            taille += octets_en_memoire(self._x) + octets_en_memoire(self._y)
+        if self._origines is not None:
+            taille += octets_en_memoire(self._origines)
+        if self._grille is not None:
+            taille += self._grille.nbytes
+        return taille
+
+    def instantane(self):
+        """Forme compacte de la population : graine, indices des marqués et historiques.
+
+        Les positions ne sont gardées que si elles ne se déduisent plus de la
+        graine (poissons déplacés) ; les numéros d'origine, que si des poissons
+        sont morts ou partis depuis la génération.
+        """
+        return {
+            'N': self.N,
+            'graine': self.graine,
+            'marques': self._marques,
+            'historiques': self.historiques,
+            'positions': None if self._x is None else (self._x, self._y),
+            'origines': self._origines,
+        }
+
+    @classmethod
+    def depuis_instantane(cls, instantane):
+        """Reconstruit exactement la population décrite par ``instantane``."""
+        population = cls(instantane['N'], graine=instantane['graine'])
+        if instantane['positions'] is not None:
+            population._x, population._y = instantane['positions']
+        if instantane['origines'] is not None:
+            population._origines = np.asarray(instantane['origines'], dtype=np.int64)
+        population._marques = np.asarray(instantane['marques'], dtype=np.int64)
+        population.historiques = instantane['historiques']
+        return population
+
+    # --- POSITIONS ---
+    def positions(self, indices=None):
+        """Coordonnées (x, y) des poissons ``indices`` (tous par défaut), sans rien stocker."""
+        if self._x is not None:
+            if indices is None:
+                return self._x, self._y
+            return self._x[indices], self._y[indices]
+        indices = np.arange(self.N) if indices is None else indices
+        if self._origines is not None:
+            indices = self._origines[indices]
+        return uniformes_indexees(self.graine, indices, 0), uniformes_indexees(self.graine, indices, 1)
+
+    def _materialiser(self):
+        if self._x is None:
+            self._x, self._y = self.positions()
+            self._origines = None
+
+    @property
+    def x(self):
+        """Abscisses de tous les poissons, modifiables en place.
+
+        Le premier accès rend les positions explicites (O(N)) : à réserver aux
+        traitements qui déplacent les poissons, comme le mélange.
+        """
+        self._materialiser()
+        return self._x
+
+    @property
+    def y(self):
+        self._materialiser()
+        return self._y
+
+    @property
+    def grille(self):
+        """Index spatial des positions, construit au premier besoin et invalidé quand les poissons bougent."""
+        if self._grille is None:
+            # Les positions calculées pour construire la grille ne sont pas gardées
+            self._grille = GrilleSpatiale(*self.positions(), positions=self.positions)
+        return self._grille
+
+    def positions_modifiees(self):
+        """À appeler après avoir déplacé des poissons : l'index spatial sera reconstruit."""
+        self._grille = None
+
+    def dans_zone(self, zone):
+        return self.grille.dans_zone(zone)
+
+    def est_marque(self, indices):
+        """Booléens « marqué » pour les poissons d'indices donnés (recherche dichotomique, O(k log M))."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.M == 0:
+            return np.zeros(indices.shape, dtype=bool)
+        rangs = np.minimum(np.searchsorted(self._marques, indices), self.M - 1)
+        return self._marques[rangs] == indices
+
+    def statut(self):
+        """Masque booléen de longueur N : True pour les poissons marqués."""
+        statut = np.zeros(self.N, dtype=bool)
+        statut[self._marques] = True
+        return statut
+
+    def tirer(self, k, rng):
+        """Échantillon aléatoire de k poissons distincts (indices)."""
+        k = min(int(k), self.N)
+        if k > SEUIL_ENUMERATION * self.N:
+            return rng.choice(self.N, k, replace=False)
+        return tirer_sans_remise(rng, self.N, k)
+
+    def tirer_non_marques(self, k, rng):
+        """Échantillon aléatoire de k poissons non marqués distincts (indices)."""
+        disponibles = self.N - self.M
+        k = min(int(k), disponibles)
+        if k > SEUIL_ENUMERATION * disponibles:
+            return rng.choice(np.flatnonzero(~self.statut()), k, replace=False)
+        return tirer_sans_remise(rng, self.N, k, exclus=self.est_marque)
+
+    def tirer_dans_zone(self, k, rng, zone, non_marques=False):
+        """Échantillon de k poissons distincts pris dans ``zone`` (moins s'il n'y en a pas assez)."""
+        candidats = self.dans_zone(zone)
+        if non_marques:
+            candidats = candidats[~self.est_marque(candidats)]
+        return rng.choice(candidats, min(int(k), len(candidats)), replace=False)
+
+    def marquer(self, indices):
+        """Pose la marque sur les poissons d'indices donnés et met à jour M."""
+        indices = uniques_tries(np.asarray(indices, dtype=np.int64))
+        nouveaux = indices[~self.est_marque(indices)]
+        # Insertion triée de valeurs triées : O(M + k), le tableau reste trié
+        self._marques = np.insert(self._marques, np.searchsorted(self._marques, nouveaux), nouveaux)
+        return len(nouveaux)
+
+    def capturer(self, indices, marquer=True, aleatoire=True):
+        """Enregistre une occasion de capture et renvoie le nombre de poissons déjà marqués pris.
+
+        ``marquer`` : les poissons pris non marqués sont marqués avant d'être relâchés.
+        ``aleatoire`` : l'échantillon a été tiré dans toute la population (et pas
+        seulement parmi les non marqués), l'occasion compte donc pour Schnabel.
+        """
+        deja_marques = int(self.est_marque(indices).sum())
+        self.historiques.enregistrer(indices, marquante=marquer, aleatoire=aleatoire)
+        if marquer:
+            self.marquer(indices)
+        return deja_marques
+
+    def retirer(self, garde):
+        """Compacte la population en ne gardant que les poissons où ``garde`` est vrai (morts, émigrés...).
+
+        Les survivants sont renumérotés dans l'ordre. La table des nouveaux
+        numéros est calculée une fois, en entiers 32 bits, et sert aux marqués
+        comme aux historiques.
+        """
+        if len(garde) == 0:
+            return
+        rang = np.cumsum(garde, dtype=np.int32 if self.N < 2**31 else np.int64)
+        rang -= 1
+        if self._x is not None:
+            self._x = self._x[garde]
+            self._y = self._y[garde]
+        else:
+            # Population paresseuse : on garde le numéro d'origine des survivants, pas leurs positions
+            self._origines = np.flatnonzero(garde) if self._origines is None else self._origines[garde]
+        survivants = self._marques[garde[self._marques]]
+        self._marques = rang[survivants].astype(np.int64)
+        self.historiques.renumeroter(garde, rang)
+        self.positions_modifiees()
+        self.N = int(rang[-1]) + 1
+
+    def ajouter(self, nombre, rng):
+        """Ajoute ``nombre`` poissons non marqués (naissances, immigration) à des positions aléatoires."""
+        # Population paresseuse : les nouveaux numéros ont déjà leur position (graine, i)
+        if self._x is not None:
+            self._x = np.concatenate((self._x, rng.random(nombre, dtype=np.float32)))
+            self._y = np.concatenate((self._y, rng.random(nombre, dtype=np.float32)))
+        elif self._origines is not None:
+            # Numéros d'origine jamais attribués, après le plus grand déjà pris (ou depuis 0 si plus personne)
+            premier = int(self._origines[-1]) + 1 if len(self._origines) else 0
+            self._origines = np.concatenate((self._origines, np.arange(premier, premier + int(nombre))))
+        self.positions_modifiees()
+        self.N += int(nombre)
+
+    def demarquer(self, indices):
+        """Retire la marque des poissons ``indices`` : pour l'observateur, ce sont de nouveaux poissons."""
+        indices = uniques_tries(np.asarray(indices, dtype=np.int64))
+        marques = indices[self.est_marque(indices)]
+        self._marques = np.delete(self._marques, np.searchsorted(self._marques, marques))
+        self.historiques.detacher(marques)
+        return len(marques)
@@ -0,0 +1,144 @@
+"""Profilage par sections nommées, à chaque exécution du script et sur toute la session.
+
+Usage :
+
+    profil.nouveau_passage()
+    with profil.section("css"):
+        ...
+    profil.terminer_passage()
+
+Quand le profilage est désactivé, ``section`` ne fait rien (coût négligeable).
+Le suivi des allocations (tracemalloc) est global au processus : il est
+partagé entre les sessions qui le demandent, et arrêté quand la dernière y
+renonce.
+Chaque passage terminé est aussi écrit dans le journal ``cmr.profilage`` sous
+forme d'une ligne JSON, pour l'analyse d'une classe entière côté serveur.
+"""
+
+import csv
+import io
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+journal = logging.getLogger("cmr.profilage")
+
+# Nombre de mesures gardées par section pour les percentiles glissants
+FENETRE = 200
+
+# Profileurs qui mesurent les allocations : tracemalloc tourne tant qu'il en reste un
+_traceurs = 0
+_verrou_traceurs = threading.Lock()
+
+
+def _suivre_allocations(activer):
+    global _traceurs
+    with _verrou_traceurs:
+        _traceurs += 1 if activer else -1
+        if _traceurs == 1 and activer and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif _traceurs == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Profileur:
+    def __init__(self, session="", fenetre=FENETRE):
+        self.session = session
+        self.actif = False
+        self.allocations = False
+        self.passages = 0
+        self._fenetre = fenetre
+        self._historique = {}
+        self._passage = {}
+        self._debut_passage = None
+
+    def configurer(self, actif, allocations=False):
+        self.actif = actif
+        allocations = actif and allocations
+        if allocations != self.allocations:
+            _suivre_allocations(allocations)
+            self.allocations = allocations
+
+    def __del__(self):
+        # Session réinitialisée ou fermée pendant une mesure : elle ne retient plus le suivi
+        if self.allocations:
+            _suivre_allocations(False)
+
+    def nouveau_passage(self):
+        self._passage = {}
+        self._debut_passage = time.perf_counter()
+
+    def section(self, nom):
+        return self._mesurer(nom) if self.actif else nullcontext()
+
+    @contextmanager
+    def _mesurer(self, nom):
+        if self.allocations:
+            # Le pic est global : on ne le remet à zéro que si aucune autre session ne mesure.
+            # Sinon on relève la variation de la mémoire suivie, qui inclut leurs allocations.
+            with _verrou_traceurs:
+                seul = _traceurs == 1
+                if seul:
+                    tracemalloc.reset_peak()
+                memoire_avant = tracemalloc.get_traced_memory()[0]
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = (time.perf_counter() - debut) * 1e3
+            octets = 0
+            if self.allocations:
+                courante, pic = tracemalloc.get_traced_memory()
+                octets = max((pic if seul else courante) - memoire_avant, 0)
+            precedent = self._passage.get(nom, (0.0, 0))
+            self._passage[nom] = (precedent[0] + duree, max(precedent[1], octets))
+
+    def terminer_passage(self):
+        """Clôt le passage : ajoute la section « total », met à jour l'historique et écrit le journal."""
+        if not self.actif or self._debut_passage is None:
+            return
+        self._passage["total"] = ((time.perf_counter() - self._debut_passage) * 1e3, 0)
+        self.passages += 1
+        for nom, (duree, octets) in self._passage.items():
+            self._historique.setdefault(nom, deque(maxlen=self._fenetre)).append((self.passages, duree, octets))
+        journal.info(json.dumps({
+            "session": self.session,
+            "passage": self.passages,
+            "sections": {nom: {"ms": round(duree, 3), "octets": octets} for nom, (duree, octets) in self._passage.items()},
+        }))
+        self._debut_passage = None
+
+    @property
+    def dernier_passage(self):
+        return dict(self._passage)
+
+    def resume(self):
+        """Par section : nombre de mesures, p50 et p95 glissants du temps (ms), allocation maximale (octets)."""
+        lignes = []
+        for nom, mesures in self._historique.items():
+            durees = np.array([duree for _, duree, _ in mesures])
+            lignes.append({
+                "section": nom,
+                "mesures": len(durees),
+                "p50_ms": float(np.percentile(durees, 50)),
+                "p95_ms": float(np.percentile(durees, 95)),
+                "allocation_max_octets": max(octets for _, _, octets in mesures),
+            })
+        return sorted(lignes, key=lambda ligne: ligne["p95_ms"], reverse=True)
+
+    def csv(self):
+        """Toutes les mesures gardées, une ligne par (passage, section)."""
+        tampon = io.StringIO()
+        ecrivain = csv.writer(tampon)
+        ecrivain.writerow(["session", "passage", "section", "duree_ms", "allocation_octets"])
+        lignes = sorted((passage, nom, duree, octets) for nom, mesures in self._historique.items()
+                        for passage, duree, octets in mesures)
+        for passage, nom, duree, octets in lignes:
+            ecrivain.writerow([self.session, passage, nom, f"{duree:.3f}", octets])
+        return tampon.getvalue()
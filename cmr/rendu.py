@@ -0,0 +1,61 @@
+"""Préparation des données affichées : un budget fixe de points, quel que soit N.
+
+pandas n'est importé que lorsqu'on construit réellement un DataFrame.
+"""
+
+import numpy as np
+
+from cmr.population import tirer_sans_remise
+
+# Au-delà de quelques milliers de points, st.scatter_chart fait ramer le navigateur
+BUDGET_POINTS = 5_000
+
+
+def indices_affichage(N, rng, budget=BUDGET_POINTS):
+    """Sous-ensemble fixe et trié des poissons dessinés dans la vue du lagon.
+
+    Tiré une fois pour toutes à la génération : la vue ne « saute » pas d'un
+    rafraîchissement à l'autre, et la proportion de marqués parmi les points
+    affichés est un échantillon sans biais de M / N.
+    """
+    if N <= budget:
+        return np.arange(N, dtype=np.int64)
+    return np.sort(tirer_sans_remise(rng, N, budget))
+
+
+def vue_lagon(population, indices):
+    """DataFrame (x, y, Statut) des seuls poissons affichés : coût O(budget), pas O(N)."""
+    import pandas as pd
+
+    x, y = population.positions(indices)
+    return pd.DataFrame({
+        'x': x,
+        'y': y,
+        'Statut': np.where(population.est_marque(indices), 'Marqué', 'Non marqué')
+    })
+
+
+def vue_filet(x, y, marques):
+    """DataFrame (x, y, Statut) du contenu du filet."""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'x': x,
+        'y': y,
+        'Statut': np.where(marques, 'Marqué', 'Non marqué')
+    })
+
+
+def tableau_occasions(historiques):
+    """Une ligne par occasion de capture : type, C_t, R_t et M_t."""
+    import pandas as pd
+
+    C, R, M_avant = historiques.par_occasion()
+    return pd.DataFrame({
+        'Occasion': np.arange(1, historiques.K + 1),
+        'Type': np.where(~historiques.occasions_aleatoires, 'Marquage',
+                         np.where(historiques.occasions_marquantes, 'Capture + marquage', 'Recapture')),
+        'Capturés (C)': C,
+        'Déjà marqués (R)': R,
+        'Marqués avant (M)': M_avant
+    })
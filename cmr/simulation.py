@@ -0,0 +1,251 @@
+"""Séance CMR complète, sans Streamlit : l'état d'un élève et toutes ses actions.
+
+``app.py`` garde une ``Simulation`` par session et ne fait que l'afficher ;
+la même classe sert aux scripts de profilage, aux benchmarks et aux calculs
+en lot.
+
+    sim = Simulation(graine=42)
+    sim.generer(10_000)
+    sim.marquer(500)
+    sim.recapturer(500)
+    sim.estimation()
+"""
+
+import threading
+
+import numpy as np
+
+from cmr.aleatoire import creer_generateur
+from cmr.bayesien import LoiAPosteriori
+from cmr.dynamique import pas_de_temps
+from cmr.estimateurs import lincoln_petersen
+from cmr.etat import VuesDerivees
+from cmr.historiques import OCCASIONS_MAX
+from cmr.melange import etapes_melange
+from cmr.population import Population, octets_en_memoire, projeter_sur_disque
+from cmr.rendu import BUDGET_POINTS, indices_affichage, tableau_occasions, vue_filet, vue_lagon
+
+
+class Simulation:
+    """État d'une séance : population, générateur aléatoire et comptes de l'observateur.
+
+    ``M``, ``n`` et ``m`` sont ce que l'élève a observé. ``M`` peut donc
+    différer du nombre de poissons réellement marqués (``population.M``) après
+    des morts ou des pertes de marques.
+    """
+
+    def __init__(self, graine=None):
+        self.graine, self.rng = creer_generateur(graine)
+        # Population vide sans tirage dans le générateur : une séance rejouée depuis sa graine
+        # (``reensemencer``) doit retrouver exactement les mêmes tirages
+        self._population = Population(0, graine=0)
+        # Forme compacte de la population quand la séance est endormie (voir ``endormir``)
+        self._instantane = None
+        self._verrou = threading.Lock()
+        self.M = 0
+        self.n = 0
+        self.m = 0
+        # N est caché à l'élève (Module 2, expériences de classe) : la séance ne s'enregistre pas
+        self.N_secret = False
+        # Contenu du dernier filet (au plus BUDGET_POINTS poissons) : positions et marques
+        self.filet = None
+        self.indices_lagon = np.empty(0, dtype=np.int64)
+        self.bilan_temps = None
+        # Loi a posteriori de N, mise à jour occasion par occasion (voir ``loi_a_posteriori``)
+        self.a_posteriori = None
+        self.vues = VuesDerivees()
+
+    def reensemencer(self, graine):
+        """Repart d'une graine donnée (la population en cours est conservée)."""
+        self.graine, self.rng = creer_generateur(graine)
+
+    @property
+    def population(self):
+        """Population en cours, reconstruite depuis l'instantané si la séance dormait."""
+        with self._verrou:
+            if self._population is None:
+                self._population = Population.depuis_instantane(self._instantane)
+                self._instantane = None
+            return self._population
+
+    @population.setter
+    def population(self, population):
+        with self._verrou:
+            self._population = population
+            self._instantane = None
+
+    @property
+    def endormie(self):
+        return self._population is None
+
+    def endormir(self, dossier=None):
+        """Compacte la séance : la population est réduite à (graine, indices marqués, historiques).
+
+        Les tableaux de taille N et les vues mémoïsées sont libérés ; la
+        population sera reconstruite à l'identique au prochain accès. Des
+        positions explicites (poissons déplacés) ne se déduisent plus de la
+        graine : elles sont rangées dans un fichier temporaire de ``dossier``
+        et relues par projection en mémoire, comme les numéros d'origine des
+        survivants. Renvoie le nombre d'octets libérés.
+        """
+        with self._verrou:
+            if self._population is None:
+                return 0
+            avant = self.nbytes
+            instantane = self._population.instantane()
+            if instantane['positions'] is not None:
+                instantane['positions'] = tuple(projeter_sur_disque(tableau, dossier) for tableau in instantane['positions'])
+            if instantane['origines'] is not None:
+                instantane['origines'] = projeter_sur_disque(instantane['origines'], dossier)
+            self._instantane = instantane
+            self._population = None
+            # Recalculable depuis les historiques, conservés dans l'instantané
+            self.a_posteriori = None
+            self.vues.oublier()
+            return avant - self.nbytes
+
+    @property
+    def nbytes(self):
+        """Mémoire vive occupée par les tableaux NumPy de la séance (hors vues mémoïsées et projections)."""
+        if self._population is not None:
+            taille = self._population.nbytes
+        else:
+            instantane = self._instantane
+            taille = instantane['marques'].nbytes + instantane['historiques'].nbytes
+            if instantane['positions'] is not None:
+                taille += sum(octets_en_memoire(tableau) for tableau in instantane['positions'])
+            if instantane['origines'] is not None:
+                taille += octets_en_memoire(instantane['origines'])
+        if self.filet is not None:
+            taille += sum(tableau.nbytes for tableau in self.filet.values())
+        if self.a_posteriori is not None:
+            taille += self.a_posteriori.nbytes
+        return taille + self.indices_lagon.nbytes
+
+    @property
+    def N(self):
+        """Taille réelle de la population, inconnue de l'élève dans le Module 2."""
+        return len(self.population)
+
+    @property
+    def occasions_epuisees(self):
+        """Vrai quand l'historique de la population est plein : plus aucune capture n'est possible."""
+        return self.population.historiques.K >= OCCASIONS_MAX
+
+    @property
+    def version(self):
+        return self.vues.version
+
+    def _modifiee(self):
+        self.vues.incrementer()
+
+    # --- ACTIONS ---
+    def generer(self, N, graine=None, secret=False):
+        """Nouvelle population de N poissons ; avec ``graine``, la même pour tous ceux qui la partagent.
+
+        ``secret`` : N est caché à l'élève (voir ``N_secret``).
+        """
+        self.population = Population(N, self.rng, graine=graine)
+        self.N_secret = secret
+        self.indices_lagon = indices_affichage(N, self.rng)
+        self.M = self.n = self.m = 0
+        self.filet = None
+        self.bilan_temps = None
+        self.a_posteriori = None
+        self._modifiee()
+
+    def generer_mystere(self, minimum=500, maximum=3000):
+        self.generer(int(self.rng.integers(minimum, maximum, endpoint=True)), secret=True)
+
+    def marquer(self, quantite, zone=None):
+        """Capture ``quantite`` poissons non marqués (dans ``zone`` si donnée) et les marque."""
+        population = self.population
+        if zone is None:
+            a_marquer = population.tirer_non_marques(quantite, self.rng)
+        else:
+            a_marquer = population.tirer_dans_zone(quantite, self.rng, zone, non_marques=True)
+        population.capturer(a_marquer, marquer=True, aleatoire=False)
+        self.M += len(a_marquer)
+        self._modifiee()
+        return len(a_marquer)
+
+    def recapturer(self, quantite, zone=None):
+        """Recapture ``quantite`` poissons et compte les marqués (m), sans marquer les autres."""
+        population = self.population
+        if zone is None:
+            indices = population.tirer(quantite, self.rng)
+        else:
+            indices = population.tirer_dans_zone(quantite, self.rng, zone)
+        marques = population.est_marque(indices)
+        population.capturer(indices, marquer=False)
+        self.n = len(indices)
+        self.m = int(marques.sum())
+        # Les indices sont déjà dans un ordre aléatoire : les premiers forment un échantillon du filet
+        x, y = population.positions(indices[:BUDGET_POINTS])
+        self.filet = {'x': x, 'y': y, 'marques': marques[:BUDGET_POINTS]}
+        self._modifiee()
+        return self.m
+
+    def capture_successive(self, quantite):
+        """Occasion de Schnabel : capture au hasard, marque les non marqués et relâche."""
+        population = self.population
+        marques_avant = population.M
+        population.capturer(population.tirer(quantite, self.rng), marquer=True)
+        # L'observateur ne compte que les marques qu'il a posées (il ignore morts et marques perdues)
+        self.M += population.M - marques_avant
+        # M a changé : l'estimation de Lincoln-Petersen du dernier filet n'est plus valable
+        self.filet = None
+        self._modifiee()
+
+    def faire_passer_le_temps(self, dynamique):
+        self.bilan_temps = pas_de_temps(self.population, dynamique, self.rng)
+        self.indices_lagon = indices_affichage(self.N, self.rng)
+        self._modifiee()
+        return self.bilan_temps
+
+    def melanger(self, pas, force):
+        for _ in self.etapes_melange(pas, force):
+            pass
+
+    def etapes_melange(self, pas, force):
+        """Générateur : un pas de mélange par itération (voir ``cmr.melange``)."""
+        try:
+            yield from etapes_melange(self.population, pas, force, self.rng)
+        finally:
+            self._modifiee()
+
+    def images_melange(self, pas, force, tous_les=5):
+        """Images du lagon produites à la demande pendant le mélange."""
+        for numero in self.etapes_melange(pas, force):
+            if numero % tous_les == 0 or numero == pas:
+                yield numero, self.vue_lagon(memoriser=False)
+
+    # --- RÉSULTATS ---
+    def estimation(self):
+        """Estimation de Lincoln-Petersen du dernier filet (NaN si m = 0)."""
+        return float(lincoln_petersen(self.M, self.n, self.m))
+
+    def loi_a_posteriori(self, N_min, N_max):
+        """Loi a posteriori de N (a priori uniforme sur [N_min, N_max]) sachant toutes les occasions.
+
+        Seules les occasions nouvelles depuis l'appel précédent sont intégrées ;
+        la loi repart de zéro si l'intervalle change.
+        """
+        historiques = self.population.historiques
+        loi = self.a_posteriori
+        if loi is None or (loi.N_min, loi.N_max) != (N_min, N_max) or loi.occasions > historiques.K:
+            loi = self.a_posteriori = LoiAPosteriori(N_min, N_max)
+        loi.mettre_a_jour(historiques)
+        return loi
+
+    # --- VUES DÉRIVÉES, MÉMOÏSÉES SUR LA VERSION ---
+    def vue_lagon(self, memoriser=True):
+        if not memoriser:
+            return vue_lagon(self.population, self.indices_lagon)
+        return self.vues.obtenir('lagon', lambda: vue_lagon(self.population, self.indices_lagon))
+
+    def vue_filet(self):
+        return self.vues.obtenir('filet', lambda: vue_filet(**self.filet))
+
+    def vue_occasions(self):
+        return self.vues.obtenir('occasions', lambda: tableau_occasions(self.population.historiques))
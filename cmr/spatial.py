@@ -0,0 +1,70 @@
+"""Index spatial en grille uniforme sur le lagon [0, 1[ × [0, 1[.
+
+Les poissons sont triés par case (tri par dénombrement) ; une case est alors
+une tranche contiguë de ``ordre`` et une ligne de cases aussi. Chercher les
+poissons d'un disque ne parcourt que les lignes de cases qu'il recouvre, pas
+toute la population.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Nombre moyen de poissons par case visé pour choisir la finesse de la grille
+POISSONS_PAR_CASE = 16
+
+
+@dataclass(frozen=True)
+class Zone:
+    """Disque du lagon où l'on pose le filet (centre et rayon en coordonnées du lagon)."""
+
+    x: float
+    y: float
+    rayon: float
+
+    def contient(self, x, y):
+        return (x - self.x) ** 2 + (y - self.y) ** 2 <= self.rayon ** 2
+
+
+class GrilleSpatiale:
+    __slots__ = ("cote", "ordre", "debuts", "positions")
+
+    def __init__(self, x, y, cote=None, positions=None):
+        """``positions(indices)`` renvoie les coordonnées des candidats d'une zone ;
+        par défaut la grille garde ``x`` et ``y``, mais une population paresseuse
+        les recalcule plutôt que de les stocker."""
+        N = len(x)
+        self.cote = cote or max(1, int(np.sqrt(N / POISSONS_PAR_CASE)))
+        self.positions = positions or (lambda indices: (x[indices], y[indices]))
+        colonne = np.minimum((x * self.cote).astype(np.int32), self.cote - 1)
+        ligne = np.minimum((y * self.cote).astype(np.int32), self.cote - 1)
+        case = colonne * self.cote + ligne
+        # Jusqu'à 256 × 256 cases, le numéro tient sur 16 bits et NumPy trie par base (radix)
+        if self.cote * self.cote <= 2**16:
+            case = case.astype(np.uint16)
+            self.ordre = np.argsort(case, kind="stable")
+        else:
+            self.ordre = np.argsort(case)
+        self.ordre = self.ordre.astype(np.int32 if N < 2**31 else np.int64)
+        self.debuts = np.zeros(self.cote * self.cote + 1, dtype=np.int64)
+        np.cumsum(np.bincount(case, minlength=self.cote * self.cote), out=self.debuts[1:])
+
+    @property
+    def nbytes(self):
+        return self.ordre.nbytes + self.debuts.nbytes
+
+    def _cases(self, debut, fin):
+        return max(0, int(np.floor(debut * self.cote))), min(self.cote - 1, int(np.floor(fin * self.cote)))
+
+    def dans_zone(self, zone):
+        """Indices (non triés) des poissons situés dans ``zone``."""
+        colonne_min, colonne_max = self._cases(zone.x - zone.rayon, zone.x + zone.rayon)
+        ligne_min, ligne_max = self._cases(zone.y - zone.rayon, zone.y + zone.rayon)
+        if colonne_min > colonne_max or ligne_min > ligne_max:
+            return np.empty(0, dtype=np.int64)
+        tranches = [
+            self.ordre[self.debuts[c * self.cote + ligne_min]:self.debuts[c * self.cote + ligne_max + 1]]
+            for c in range(colonne_min, colonne_max + 1)
+        ]
+        candidats = np.concatenate(tranches).astype(np.int64)
+        return candidats[zone.contient(*self.positions(candidats))]
@@ -0,0 +1,187 @@
+"""Statistiques exactes de la recapture, calculées sur la loi hypergéométrique de m.
+
+Tout est évalué en log-espace sur des tableaux NumPy, et les lois sont
+mémoïsées par triplet (N, M, n) : aucune simulation, donc aucun bruit
+d'échantillonnage. Les log-factorielles sont calculées à la demande sur les
+seules valeurs utiles (série de Stirling) : aucune table de taille N ne reste
+en mémoire, et une loi mémoïsée ne couvre que la fenêtre où m a une masse
+non négligeable.
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from cmr.estimateurs import chapman, intervalle_chapman, lincoln_petersen
+
+# Demi-largeur de la fenêtre de m autour de sa moyenne, en écarts-types (la masse en dehors est négligeable)
+FENETRE_SIGMAS = 8
+
+# En dessous, log(k!) vient d'une petite table exacte ; au-delà, la série de Stirling
+# arrêtée au terme en 1/x⁵ est exacte à la précision des flottants
+_PETITS = 64
+_TABLE_PETITS = np.array([math.lgamma(k + 1) for k in range(_PETITS)])
+_DEMI_LOG_2PI = 0.5 * math.log(2 * math.pi)
+# Taille des blocs de ``log_factorielles`` (tableaux intermédiaires de 256 Ko)
+_BLOC = 32_768
+
+
+def _stirling(x, out=None):
+    """log Γ(x) pour des flottants x ≥ _PETITS + 1 (série de Stirling), dans ``out`` si donné."""
+    inverse = np.divide(1.0, x)
+    carre = np.multiply(inverse, inverse)
+    serie = np.multiply(carre, -1 / 1260)
+    serie += 1 / 360
+    serie *= carre
+    np.subtract(1 / 12, serie, out=serie)
+    serie *= inverse
+    resultat = np.log(x, out=out)
+    np.subtract(x, 0.5, out=carre)
+    resultat *= carre
+    resultat -= x
+    resultat += serie
+    resultat += _DEMI_LOG_2PI
+    return resultat
+
+
+def log_factorielle(k):
+    """log(k!) élément par élément, vectorisé (aucune table de taille max(k)).
+
+    Calculé par blocs : les tableaux intermédiaires restent petits (dans le
+    cache), seul le résultat a la taille de ``k``.
+    """
+    forme = np.shape(k)
+    k = np.ravel(k)
+    resultat = np.empty(len(k))
+    for i in range(0, len(k), _BLOC):
+        _stirling(k[i:i + _BLOC] + 1.0, out=resultat[i:i + _BLOC])
+    petits = k < _PETITS
+    if petits.any():
+        resultat[petits] = _TABLE_PETITS[k[petits]]
+    return resultat.reshape(forme)
+
+
+def log_factorielles(debut, fin):
+    """log(k!) pour k = debut..fin-1."""
+    resultat = np.empty(max(fin - debut, 0))
+    # Les petits k, s'il y en a, sont en tête de la plage
+    petits = min(max(_PETITS - debut, 0), len(resultat))
+    resultat[:petits] = _TABLE_PETITS[debut:debut + petits]
+    for i in range(petits, len(resultat), _BLOC):
+        bloc = resultat[i:i + _BLOC]
+        _stirling(np.arange(debut + i + 1.0, debut + i + 1.0 + len(bloc)), out=bloc)
+    return resultat
+
+
+def log_combinaisons(n, k):
+    """log C(n, k), vectorisé sur n et k."""
+    return log_factorielle(n) - log_factorielle(k) - log_factorielle(np.subtract(n, k))
+
+
+def fenetre_m(N, M, n):
+    """Bornes (incluses) des valeurs de m à ±FENETRE_SIGMAS écarts-types de la moyenne, dans le support, vectorisé."""
+    proportion = M / N
+    moyenne = n * proportion
+    ecart = np.sqrt(moyenne * (1 - proportion) * (N - n) / np.maximum(N - 1, 1))
+    debut = np.maximum(np.maximum(0, n - (N - M)), np.floor(moyenne - FENETRE_SIGMAS * ecart).astype(np.int64) - 1)
+    fin = np.minimum(np.minimum(M, n), np.ceil(moyenne + FENETRE_SIGMAS * ecart).astype(np.int64) + 1)
+    return debut, fin
+
+
+@lru_cache(maxsize=256)
+def loi_m(N, M, n):
+    """Support utile et probabilités de m ~ Hypergéométrique(N, M, n), en lecture seule.
+
+    Le support est réduit à la fenêtre de ±8 écarts-types autour de la
+    moyenne : la masse en dehors est sous la précision des flottants, et la
+    taille des tableaux ne dépend pas de N.
+    """
+    if not (0 <= M <= N and 0 <= n <= N):
+        raise ValueError(f"il faut 0 ≤ M ≤ N et 0 ≤ n ≤ N (N = {N}, M = {M}, n = {n})")
+    debut, fin = (int(v) for v in fenetre_m(N, M, n))
+    m = np.arange(debut, fin + 1)
+    # Les termes constants (ne dépendant pas de m) disparaissent à la normalisation
+    log_p = log_factorielles(debut, fin + 1)
+    log_p += log_factorielle(M - m)
+    log_p += log_factorielle(n - m)
+    log_p += log_factorielle(N - M - n + m)
+    np.negative(log_p, out=log_p)
+    log_p -= log_p.max()
+    p = np.exp(log_p, out=log_p)
+    p /= p.sum()
+    m.flags.writeable = False
+    p.flags.writeable = False
+    return m, p
+
+
+@dataclass(frozen=True)
+class StatistiquesExactes:
+    """Moments exacts des estimateurs pour un triplet (N, M, n)."""
+
+    N: int
+    M: int
+    n: int
+    p_m_nul: float
+    # Lincoln-Petersen, conditionnellement à m > 0 (sinon il n'est pas défini)
+    esperance_lp: float
+    variance_lp: float
+    # Chapman, défini pour tout m
+    esperance_chapman: float
+    variance_chapman: float
+
+
+@lru_cache(maxsize=256)
+def statistiques_exactes(N, M, n):
+    m, p = loi_m(N, M, n)
+    valides = m > 0
+    p_m_nul = float(p[~valides].sum())
+    if valides.any():
+        p_valides = p[valides] / p[valides].sum()
+        lp = lincoln_petersen(M, n, m[valides])
+        esperance_lp = float(p_valides @ lp)
+        variance_lp = float(p_valides @ (lp - esperance_lp) ** 2)
+    else:
+        esperance_lp = variance_lp = float("nan")
+    nc = chapman(M, n, m)
+    esperance_chapman = float(p @ nc)
+    return StatistiquesExactes(
+        N=N, M=M, n=n, p_m_nul=p_m_nul,
+        esperance_lp=esperance_lp, variance_lp=variance_lp,
+        esperance_chapman=esperance_chapman,
+        variance_chapman=float(p @ (nc - esperance_chapman) ** 2),
+    )
+
+
+def percentile_resultat(N, M, n, m_observe):
+    """Rang (en %) de l'estimation obtenue avec ``m_observe`` : P(N_est ≤ estimation observée | m > 0)."""
+    if m_observe <= 0:
+        return float("nan")
+    m, p = loi_m(N, M, n)
+    valides = m > 0
+    # N_est ≤ M n / m_observe  ⇔  m ≥ m_observe
+    return 100.0 * float(p[m >= m_observe].sum() / p[valides].sum())
+
+
+def resume_observation(M, n, m_observe):
+    """Estimation de Chapman et son intervalle de confiance à 95 % pour une recapture observée."""
+    basse, haute = intervalle_chapman(M, n, m_observe)
+    # On a vu au moins M + n - m poissons différents : N ne peut pas être plus petit
+    return float(chapman(M, n, m_observe)), max(float(basse), float(M + n - m_observe)), float(haute)
+
+
+def fusionner_moments(cumul, valeurs):
+    """Ajoute un lot de ``valeurs`` à (effectif, moyenne, somme des carrés des écarts), formule de Chan et al.
+
+    Le lot est résumé d'un coup puis fusionné : les résumés par blocs ou
+    incrémentaux ne revisitent jamais les valeurs déjà vues.
+    """
+    effectif, moyenne, m2 = cumul
+    k = len(valeurs)
+    if k == 0:
+        return cumul
+    moyenne_lot = valeurs.mean()
+    total = effectif + k
+    delta = moyenne_lot - moyenne
+    return total, moyenne + delta * k / total, m2 + ((valeurs - moyenne_lot) ** 2).sum() + delta ** 2 * effectif * k / total
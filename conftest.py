@@ -0,0 +1 @@
+"""Racine du dépôt : sa présence suffit à ce que ``pytest`` lancé d'ici trouve le paquet ``cmr``."""
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from cmr import Simulation
+from cmr.archive import exporter_seance, importer_seance
+
+
+def seance(melangee):
+    sim = Simulation(graine=21)
+    sim.generer(20_000)
+    sim.marquer(1_500)
+    sim.recapturer(800)
+    if melangee:
+        sim.melanger(1, 0.05)
+    return sim
+
+
+@pytest.mark.parametrize("melangee", [False, True])
+@pytest.mark.parametrize("compresser", [False, True])
+def test_reprise_rejoue_la_meme_seance(tmp_path, melangee, compresser):
+    sim = seance(melangee)
+    chemin = tmp_path / "seance.npz"
+    exporter_seance(sim, chemin, etat_app={'etape': 3}, compresser=compresser)
+    reprise, etat_app = importer_seance(str(chemin))
+    assert etat_app == {'etape': 3}
+    assert (reprise.M, reprise.n, reprise.m) == (sim.M, sim.n, sim.m)
+
+    for action in (lambda s: s.recapturer(700), lambda s: s.marquer(300), lambda s: s.recapturer(900)):
+        assert action(reprise) == action(sim)
+    originale, rejouee = sim.population, reprise.population
+    assert np.array_equal(rejouee.instantane()['marques'], originale.instantane()['marques'])
+    assert np.array_equal(rejouee.historiques.ids, originale.historiques.ids)
+    assert np.array_equal(rejouee.historiques.masques, originale.historiques.masques)
+    for colonne_reprise, colonne in zip(rejouee.positions(), originale.positions()):
+        assert np.array_equal(colonne_reprise, colonne)
+
+
+def test_reprise_depuis_octets():
+    sim = seance(melangee=False)
+    reprise, _ = importer_seance(exporter_seance(sim))
+    assert reprise.recapturer(500) == sim.recapturer(500)
+
+
+def test_seance_a_N_cache_refusee():
+    sim = Simulation(graine=4)
+    sim.generer_mystere()
+    with pytest.raises(ValueError):
+        exporter_seance(sim)
+    sim.generer(1_000)
+    importer_seance(exporter_seance(sim))
@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+
+from cmr import Simulation
+from cmr.bayesien import LoiAPosteriori
+
+
+def log_vraisemblance(N, C, R, M):
+    """log P(R | N) hypergéométrique complet, par lgamma."""
+    def log_comb(n, k):
+        return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+    if N - M < C - R:
+        return -math.inf
+    return log_comb(M, R) + log_comb(N - M, C - R) - log_comb(N, C)
+
+
+def test_loi_a_posteriori_egale_le_calcul_direct():
+    sim = Simulation(graine=5)
+    sim.generer(800)
+    sim.marquer(120)
+    for _ in range(3):
+        sim.recapturer(90)
+    historiques = sim.population.historiques
+    loi = LoiAPosteriori(300, 2_000)
+    loi.mettre_a_jour(historiques)
+
+    C, R, M = historiques.par_occasion()
+    aleatoires = historiques.occasions_aleatoires
+    vus = len(historiques.ids)
+    log_densite = np.array([
+        sum(log_vraisemblance(N, C[t], R[t], M[t]) for t in range(historiques.K) if aleatoires[t])
+        if N >= vus else -math.inf
+        for N in range(300, 2_001)
+    ])
+    attendu = np.exp(log_densite - log_densite.max())
+    attendu /= attendu.sum()
+    # Les valeurs à moins de e^-ECART_LOG du maximum sont mises à zéro
+    np.testing.assert_allclose(loi.probabilites(), attendu, rtol=1e-9, atol=1e-15)
+    assert loi.mode() == 300 + int(np.argmax(attendu))
+
+
+def test_mise_a_jour_incrementale_egale_le_recalcul_complet():
+    sim = Simulation(graine=11)
+    sim.generer(5_000)
+    sim.marquer(400)
+    loi = LoiAPosteriori(1_000, 20_000)
+    for _ in range(4):
+        sim.recapturer(300)
+        loi.mettre_a_jour(sim.population.historiques)
+    complete = LoiAPosteriori(1_000, 20_000)
+    complete.mettre_a_jour(sim.population.historiques)
+    np.testing.assert_allclose(loi.log_densite, complete.log_densite)
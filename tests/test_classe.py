@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from cmr.archive import Archive, exporter_classe
+from cmr.classe import Agregat, DepotClasse
+
+
+@pytest.fixture
+def depot(tmp_path):
+    return DepotClasse(str(tmp_path / "classe.sqlite"))
+
+
+def test_la_cle_enseignant_est_exigee(depot):
+    code, cle = depot.creer_experience(np.random.default_rng(0))
+    assert depot.experience(code.lower()).code == code
+    assert depot.experience_enseignant(code, cle).N == depot.experience(code).N
+    assert depot.experience_enseignant(code, "") is None
+    assert depot.experience_enseignant(code, code) is None
+    with pytest.raises(ValueError):
+        exporter_classe(depot, code, code)
+    depot.soumettre(code, "eleve", 100, 80, 5)
+    with Archive(exporter_classe(depot, code, cle)) as archive:
+        assert archive.meta['N'] == depot.experience(code).N
+        assert 'cle' not in archive.meta
+        assert archive['m'].tolist() == [5]
+
+
+def test_agregat_incremental_egale_la_relecture_complete(depot):
+    code, cle = depot.creer_experience(np.random.default_rng(1))
+    experience = depot.experience_enseignant(code, cle)
+    agregat = Agregat(experience)
+    rng = np.random.default_rng(2)
+    for _ in range(5):
+        for _ in range(7):
+            M, n = (int(v) for v in rng.integers(20, 200, size=2))
+            depot.soumettre(code, "eleve", M, n, int(rng.hypergeometric(M, experience.N - M, n)))
+        agregat.rattraper(depot)
+    complet = Agregat(experience)
+    complet.rattraper(depot)
+    lot = depot.soumissions(code)
+    M, n, m = lot[:, 1], lot[:, 2], lot[:, 3]
+    estimations = M[m > 0] * n[m > 0] / m[m > 0]
+    for resume in (agregat, complet):
+        assert resume.soumissions == 35
+        assert resume.moyenne == pytest.approx(estimations.mean())
+        assert resume.ecart_type == pytest.approx(estimations.std(ddof=1))
+        assert resume.estimation_commune == pytest.approx((M * n).sum() / m.sum())
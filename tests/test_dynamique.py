@@ -0,0 +1,65 @@
+import numpy as np
+
+from cmr import Population, Simulation
+from cmr.archive import exporter_seance, importer_seance
+from cmr.dynamique import Dynamique, pas_de_temps
+
+DYNAMIQUE = Dynamique(survie=0.9, emigration=0.05, recrutement=0.15, perte_marque=0.1)
+# Les nouveau-nés d'une population explicite tirent leur position dans le générateur,
+# ceux d'une population paresseuse la déduisent de la graine : comparaison sans naissances
+SANS_NAISSANCES = Dynamique(survie=0.9, emigration=0.05, perte_marque=0.1)
+
+
+def population_marquee(explicite):
+    rng = np.random.default_rng(3)
+    population = Population(20_000, graine=8)
+    population.capturer(population.tirer_non_marques(3_000, rng), aleatoire=False)
+    population.capturer(population.tirer(2_000, rng))
+    if explicite:
+        population.x
+    return population, rng
+
+
+def test_population_paresseuse_et_explicite_evoluent_pareil():
+    paresseuse, rng_p = population_marquee(explicite=False)
+    explicite, rng_e = population_marquee(explicite=True)
+    for _ in range(4):
+        assert pas_de_temps(paresseuse, SANS_NAISSANCES, rng_p) == pas_de_temps(explicite, SANS_NAISSANCES, rng_e)
+        assert paresseuse.capturer(paresseuse.tirer(1_500, rng_p)) == explicite.capturer(explicite.tirer(1_500, rng_e))
+    assert paresseuse.paresseuse and not explicite.paresseuse
+    assert len(paresseuse) == len(explicite)
+    for a, b in zip(paresseuse.positions(), explicite.positions()):
+        assert np.array_equal(a, b)
+    assert np.array_equal(paresseuse.statut(), explicite.statut())
+    assert np.array_equal(paresseuse.historiques.ids, explicite.historiques.ids)
+    assert np.array_equal(paresseuse.historiques.masques, explicite.historiques.masques)
+
+
+def test_renumerotation_egale_le_rang_des_survivants():
+    population, rng = population_marquee(explicite=False)
+    statut = population.statut()
+    ids, masques = population.historiques.ids.copy(), population.historiques.masques.copy()
+    garde = rng.random(len(population)) < 0.7
+    population.retirer(garde)
+    rang = np.cumsum(garde) - 1
+    assert np.array_equal(population.statut(), statut[garde])
+    restent = garde[ids]
+    vivants = population.historiques.ids >= 0
+    assert np.array_equal(population.historiques.ids[vivants], rang[ids[restent]])
+    assert np.array_equal(population.historiques.masques[vivants], masques[restent])
+    assert np.count_nonzero(~vivants) == np.count_nonzero(~restent)
+
+
+def test_seance_endormie_ou_reprise_apres_un_pas_de_temps():
+    sims = []
+    for _ in range(3):
+        sim = Simulation(graine=12)
+        sim.generer(30_000)
+        sim.marquer(2_000)
+        sim.faire_passer_le_temps(DYNAMIQUE)
+        sims.append(sim)
+    sims[1].endormir()
+    sims[2], _ = importer_seance(exporter_seance(sims[2]))
+    resultats = {sim.recapturer(1_000) for sim in sims}
+    assert len(resultats) == 1
+    assert all(np.array_equal(sim.population.positions()[0], sims[0].population.positions()[0]) for sim in sims)
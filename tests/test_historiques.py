@@ -0,0 +1,37 @@
+import numpy as np
+
+from cmr.historiques import Historiques
+
+
+def historiques_a_la_main():
+    """Marquage de 0, 1, 2 ; capture marquante de 1, 2, 3, 4 ; capture simple de 0, 3, 5."""
+    historiques = Historiques()
+    historiques.enregistrer([0, 1, 2], marquante=True, aleatoire=False)
+    historiques.enregistrer([4, 3, 2, 1], marquante=True, aleatoire=True)
+    historiques.enregistrer([5, 0, 3], marquante=False, aleatoire=True)
+    return historiques
+
+
+def test_par_occasion():
+    C, R, M = historiques_a_la_main().par_occasion()
+    assert C.tolist() == [3, 4, 3]
+    assert R.tolist() == [0, 2, 2]
+    assert M.tolist() == [0, 3, 5]
+
+
+def test_masques_et_estimateurs():
+    historiques = historiques_a_la_main()
+    assert historiques.ids.tolist() == [0, 1, 2, 3, 4, 5]
+    assert historiques.masques.tolist() == [0b101, 0b011, 0b011, 0b110, 0b010, 0b100]
+    assert historiques.occasions_aleatoires.tolist() == [False, True, True]
+    # Occasions aléatoires seulement : (4 × 3 + 3 × 5) / (2 + 2)
+    assert historiques.schnabel() == (4 * 3 + 3 * 5) / 4
+
+
+def test_detacher_garde_les_comptes():
+    historiques = historiques_a_la_main()
+    historiques.detacher([0, 3])
+    assert historiques.ids.tolist() == [-2, -1, 1, 2, 4, 5]
+    C, R, M = historiques.par_occasion()
+    assert (C.tolist(), R.tolist(), M.tolist()) == ([3, 4, 3], [0, 2, 2], [0, 3, 5])
+    assert np.all(historiques.ids[:-4] < 0)
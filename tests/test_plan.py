@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from cmr.estimateurs import chapman
+from cmr.plan import criteres_chapman, plan_optimal
+from cmr.statistiques import loi_m
+
+
+def criteres_directs(N, M, n):
+    """P(m = 0) et √E[(N̂ - N)²] / N sur toute la loi de m, sans fenêtre."""
+    m, p = loi_m(N, M, n)
+    p_m_nul = float(p[m == 0].sum())
+    return p_m_nul, float(np.sqrt(p @ (chapman(M, n, m) - N) ** 2)) / N
+
+
+def plan_exhaustif(N, cv_max, p_m_nul_max):
+    """Plus petit coût M + n parmi tous les couples, critères évalués directement."""
+    meilleur = None
+    for M in range(1, N + 1):
+        for n in range(1, N + 1):
+            p_m_nul, cv = criteres_directs(N, M, n)
+            if (cv_max is None or cv <= cv_max) and (p_m_nul_max is None or p_m_nul <= p_m_nul_max):
+                if meilleur is None or M + n < meilleur:
+                    meilleur = M + n
+                break
+    return meilleur
+
+
+def test_criteres_chapman_egale_la_loi_complete():
+    # La fenêtre de ±8 écarts-types néglige une masse de l'ordre de 1e-9
+    for N, M, n in [(50, 10, 10), (200, 1, 199), (200, 150, 120), (3_000, 40, 60)]:
+        p_m_nul, cv = criteres_chapman(N, M, n)
+        attendu = criteres_directs(N, M, n)
+        assert p_m_nul[0] == pytest.approx(attendu[0], rel=1e-6)
+        assert cv[0] == pytest.approx(attendu[1], rel=1e-6)
+
+
+@pytest.mark.parametrize("N, cv_max, p_m_nul_max", [(40, 0.3, None), (60, 0.15, None), (60, None, 0.01), (80, 0.25, 0.05)])
+def test_plan_optimal_egale_la_recherche_exhaustive(N, cv_max, p_m_nul_max):
+    plan = plan_optimal(N, cv_max=cv_max, p_m_nul_max=p_m_nul_max)
+    assert plan.cout == plan_exhaustif(N, cv_max, p_m_nul_max)
+    p_m_nul, cv = criteres_directs(N, plan.M, plan.n)
+    assert cv_max is None or cv <= cv_max + 1e-12
+    assert p_m_nul_max is None or p_m_nul <= p_m_nul_max + 1e-12
+
+
+def test_plan_optimal_sans_plan_sous_les_plafonds():
+    assert plan_optimal(60, cv_max=0.01, plafond_M=5, plafond_n=5) is None
@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from cmr.statistiques import fusionner_moments, log_factorielle, log_factorielles, loi_m, statistiques_exactes
+
+
+def test_log_factorielles_egales_a_lgamma():
+    k = np.concatenate((np.arange(200), [10**6, 10**7 + 3, 2**40]))
+    attendu = np.array([math.lgamma(v + 1) for v in k.tolist()])
+    np.testing.assert_allclose(log_factorielle(k), attendu, rtol=1e-15, atol=1e-12)
+    np.testing.assert_allclose(log_factorielles(50, 200), attendu[50:200], rtol=1e-15, atol=1e-12)
+
+
+def test_loi_m_limitee_a_sa_fenetre():
+    # Le support complet compterait 200 001 valeurs ; la fenêtre ne dépend que de l'écart-type de m
+    m, p = loi_m(10_000_000, 200_000, 200_000)
+    assert len(m) < 2_000
+    assert p @ m == pytest.approx(200_000 * 200_000 / 10_000_000)
+
+
+@pytest.mark.parametrize("N, M, n", [(50, 10, 10), (1_000, 100, 50), (500, 450, 300), (200, 0, 20)])
+def test_loi_m_a_les_moments_hypergeometriques(N, M, n):
+    m, p = loi_m(N, M, n)
+    assert p.sum() == pytest.approx(1)
+    assert p @ m == pytest.approx(n * M / N)
+    variance = n * (M / N) * (1 - M / N) * (N - n) / (N - 1)
+    assert p @ (m - n * M / N) ** 2 == pytest.approx(variance, abs=1e-9)
+
+
+@pytest.mark.parametrize("N, M, n", [(50, 10, 10), (300, 40, 25), (1_000, 100, 50)])
+def test_statistiques_exactes_par_enumeration(N, M, n):
+    stats = statistiques_exactes(N, M, n)
+    support = range(max(0, n - (N - M)), min(M, n) + 1)
+    p = {m: math.comb(M, m) * math.comb(N - M, n - m) / math.comb(N, n) for m in support}
+    assert stats.p_m_nul == pytest.approx(p.get(0, 0.0), abs=1e-12)
+    chapman = {m: (M + 1) * (n + 1) / (m + 1) - 1 for m in support}
+    esperance = sum(p[m] * chapman[m] for m in support)
+    assert stats.esperance_chapman == pytest.approx(esperance)
+    assert stats.variance_chapman == pytest.approx(sum(p[m] * (chapman[m] - esperance) ** 2 for m in support))
+    valides = sum(p[m] for m in support if m > 0)
+    esperance_lp = sum(p[m] * M * n / m for m in support if m > 0) / valides
+    assert stats.esperance_lp == pytest.approx(esperance_lp)
+
+
+def test_effectifs_impossibles_refuses():
+    with pytest.raises(ValueError):
+        loi_m(590, 1_000, 50)
+
+
+def test_fusion_par_lots_egale_au_calcul_direct():
+    valeurs = np.random.default_rng(0).normal(1_000, 50, 1_003)
+    cumul = (0, 0.0, 0.0)
+    for debut in range(0, len(valeurs), 100):
+        cumul = fusionner_moments(cumul, valeurs[debut:debut + 100])
+    effectif, moyenne, m2 = cumul
+    assert effectif == len(valeurs)
+    assert moyenne == pytest.approx(valeurs.mean())
+    assert m2 / effectif == pytest.approx(valeurs.var())